@@ -0,0 +1,114 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def chunk_id(doc):
+    """Stable id for a retrieved chunk: the store id when available, else a hash of its text."""
+    doc_id = getattr(doc, "id", None)
+    if doc_id:
+        return doc_id
+    return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class SemanticAnswerCache:
+    """
+    Cache of generated answers, matched by query-embedding similarity.
+
+    Generation runs at temperature 0.0 and only sees the retrieved context, so a
+    near-duplicate question in the same department that retrieves the same chunks gets
+    the same answer. An entry is reused when the department and the set of retrieved
+    chunk ids match exactly and the cosine similarity of the query embeddings is at least
+    `threshold`. Each department's entries are tagged with the version of its vector
+    store and dropped as soon as a different version is seen (i.e. the store was rebuilt).
+    """
+
+    def __init__(self, threshold=0.95, max_entries_per_department=256):
+        self.threshold = threshold
+        self.max_entries_per_department = max_entries_per_department
+        self._entries = {}   # department -> OrderedDict[(chunk key, n) -> (unit vector, answer)]
+        self._versions = {}  # department -> store version the entries were built from
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _chunk_key(docs):
+        return tuple(sorted(chunk_id(doc) for doc in docs))
+
+    def _department_entries(self, department, version):
+        """Entries for `department`, cleared first if its store version changed."""
+        if self._versions.get(department) != version:
+            if self._entries.get(department):
+                self.invalidations += 1
+            self._entries[department] = OrderedDict()
+            self._versions[department] = version
+        return self._entries[department]
+
+    def get(self, department, version, query_vector, docs):
+        """Return the cached answer for a near-duplicate query, or None."""
+        chunk_key = self._chunk_key(docs)
+        query_vector = self._unit(query_vector)
+        with self._lock:
+            entries = self._department_entries(department, version)
+            best_key, best_score = None, self.threshold
+            for key, (vector, _) in entries.items():
+                if key[0] != chunk_key:
+                    continue
+                score = float(np.dot(vector, query_vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self.misses[department] = self.misses.get(department, 0) + 1
+                return None
+            entries.move_to_end(best_key)
+            self.hits[department] = self.hits.get(department, 0) + 1
+            return entries[best_key][1]
+
+    def put(self, department, version, query_vector, docs, answer):
+        with self._lock:
+            entries = self._department_entries(department, version)
+            self._counter += 1
+            entries[(self._chunk_key(docs), self._counter)] = (self._unit(query_vector), answer)
+            while len(entries) > self.max_entries_per_department:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        departments = {}
+        for department in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(department, 0)
+            total = hits + self.misses.get(department, 0)
+            departments[department] = {
+                "hits": hits,
+                "misses": total - hits,
+                "hit_ratio": hits / total if total else 0.0,
+                "entries": len(self._entries.get(department, ())),
+            }
+        return {
+            "threshold": self.threshold,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "departments": departments,
+        }
+
+
+def answer_cache_from_env():
+    """Build the answer cache from ANSWER_CACHE_THRESHOLD and ANSWER_CACHE_SIZE (per department)."""
+    return SemanticAnswerCache(
+        threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.95)),
+        max_entries_per_department=int(os.getenv("ANSWER_CACHE_SIZE", 256)),
+    )
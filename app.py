@@ -1,5 +1,41 @@
 import streamlit as st
 import requests
+import json
+import os
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Backend location and HTTP client settings, overridable through the environment
+# e.g. BACKEND_URL=https://end-points-render.onrender.com
+BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000").rstrip("/")
+CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", 60))
+MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", 2))
+
+
+@st.cache_resource
+def get_http_session():
+    """
+    One pooled HTTP session per Streamlit server process, shared by every user session,
+    so chat messages reuse keep-alive connections to the backend instead of opening a
+    new TCP connection each time. Connection errors and 5xx responses are retried with
+    exponential backoff; queries are read-only, so retrying the POST is safe.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0, # A read timeout means the backend is still working on it, so don't pile on
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def get_backend_url(role):
@@ -10,8 +46,9 @@ def get_backend_url(role):
     """
     # Note: The backend expects specific individual roles like 'finance', 'engineering', etc.
     # The 'C-Level Executives' string itself is not sent to the backend for a query.
-    # return "https://end-points-render.onrender.com"
-    return f"http://127.0.0.1:8000/{role}/query" # All queries go to the same /query endpoint on backend
+    # "all" (every department at once) only exists as a C-Level sub-role.
+    path = f"c-level/{role}" if role == "all" else role
+    return f"{BACKEND_URL}/{path}/query"
 
 
 # Page configuration for the Streamlit application
@@ -311,21 +348,71 @@ def render_role_cards():
                 st.rerun() # Rerun the app to switch to the chat room
 
 
-def get_ai_response(prompt, role):
-    url = get_backend_url(role)
-    # role is already the backend key ("finance", "engineering", etc.)
+def stream_ai_response(prompt, role, sources, timing):
+    """
+    Streams the answer from the backend's Server-Sent Events endpoint, yielding text
+    as tokens arrive so the chat can render them immediately. Retrieved sources arrive
+    before the answer and are appended to the `sources` list passed in. Client-side
+    timings (time to first token, total) and the backend's own total are stored in
+    the `timing` dict passed in.
+    """
+    url = get_backend_url(role) + "/stream"
     payload = {
         "role": role,
-        "query": prompt
+        "query": prompt,
+        "timings": True
     }
+    start = time.perf_counter()
     try:
-        response = requests.post(url, json=payload, timeout=60)
-        if response.status_code == 200:
-            return response.json().get("response", "No response from backend.")
-        else:
-            return f"Error: {response.status_code} - {response.text}"
+        with get_http_session().post(url, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True) as response:
+            if response.status_code != 200:
+                yield f"Error: {response.status_code} - {response.text}"
+                return
+
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "sources":
+                        sources.extend(data)
+                    elif event == "token":
+                        timing.setdefault("first_token", time.perf_counter() - start)
+                        yield data["text"]
+                    elif event == "done":
+                        timing["backend_ms"] = data.get("timings_ms", {}).get("total")
+                    elif event == "error":
+                        yield f"Error: {data['detail']}"
     except Exception as e:
-        return f"Error contacting backend: {e}"
+        yield f"Error contacting backend: {e}"
+    finally:
+        timing["total"] = time.perf_counter() - start
+
+
+def render_timing(timing):
+    """Shows how long the answer took, as seen by the client and by the backend."""
+    if "total" not in timing:
+        return
+    parts = []
+    if "first_token" in timing:
+        parts.append(f"first token {timing['first_token']:.2f}s")
+    parts.append(f"total {timing['total']:.2f}s")
+    if timing.get("backend_ms") is not None:
+        parts.append(f"backend {timing['backend_ms'] / 1000:.2f}s")
+    st.caption(" · ".join(parts))
+
+
+def render_sources(sources):
+    """Shows the retrieved chunks behind an answer in a collapsed expander."""
+    if not sources:
+        return
+    with st.expander(f"Sources ({len(sources)})"):
+        for source in sources:
+            # Cross-department answers tag each source with the department it came from
+            store = source.get("metadata", {}).get("store")
+            label = f" ({store})" if store else ""
+            st.markdown(f"**Result {source['rank']}{label}:** {source['preview']}...")
 
 
 def render_home_screen():
@@ -471,7 +558,8 @@ def get_role_icon(role):
         'Marketing Team': '📈',
         'HR Team': '👥',
         'Engineering Department': '⚙️',
-        'General': '👤' # Using 'General' as the role key
+        'General': '👤', # Using 'General' as the role key
+        'All Departments': '🌐'
     }
     return icons.get(role, '👤') # Default to a generic user icon
 
@@ -483,7 +571,8 @@ def get_role_description(role):
         'Marketing Team': "Marketing analytics and campaign optimization.",
         'HR Team': "Human resources management and employee engagement.",
         'Engineering Department': "Technical support and project management.",
-        'General': "General queries and support for all employees." # Using 'General' as the role key
+        'General': "General queries and support for all employees.", # Using 'General' as the role key
+        'All Departments': "Cross-department answers drawn from every department's data at once."
     }
     return desc.get(role, "")
 
@@ -557,13 +646,14 @@ def render_chat_room():
         "Marketing Team": "marketing",
         "HR Team": "hr",
         "Engineering Department": "engineering",
-        "General": "general"
+        "General": "general",
+        "All Departments": "all" # C-Level only: searches every department at once
     }
     
     # These are the display names for the dropdown, C-Level uses these to select
     c_level_sub_roles_display = [
         "Finance Team", "Marketing Team", "HR Team", 
-        "Engineering Department", "General"
+        "Engineering Department", "General", "All Departments"
     ]
 
     actual_backend_role_to_send = "" # This will be the lowercase role string sent to backend
@@ -654,30 +744,33 @@ def render_chat_room():
             st.markdown(prompt)
 
         with st.chat_message('assistant'):
-            with st.spinner('Thinking...'): # Show a spinner while waiting for AI response
-                # Pass the dynamically determined backend role (e.g., "finance", "general")
-                if st.session_state.role == "C-Level Executives":
-                    sub_role_display = st.session_state.get("c_level_sub_role_display", "Finance")
-                    role_map = {
-                        "Finance Team": "finance",
-                        "Engineering Department": "engineering",
-                        "Marketing Team": "marketing",
-                        "HR Team": "hr",
-                        "General": "general",
-                    }
-                    backend_role = role_map.get(sub_role_display, "finance")
-                else:
-                    role_map = {
-                        "Finance Team": "finance",
-                        "Engineering Department": "engineering",
-                        "Marketing Team": "marketing",
-                        "HR Team": "hr",
-                        "General": "general",
-                    }
-                    backend_role = role_map.get(st.session_state.role, "general")
-
-                resp = get_ai_response(prompt, backend_role)
-                st.markdown(resp)
+            # Pass the dynamically determined backend role (e.g., "finance", "general")
+            if st.session_state.role == "C-Level Executives":
+                sub_role_display = st.session_state.get("c_level_sub_role_display", "Finance")
+                role_map = {
+                    "Finance Team": "finance",
+                    "Engineering Department": "engineering",
+                    "Marketing Team": "marketing",
+                    "HR Team": "hr",
+                    "General": "general",
+                    "All Departments": "all",
+                }
+                backend_role = role_map.get(sub_role_display, "finance")
+            else:
+                role_map = {
+                    "Finance Team": "finance",
+                    "Engineering Department": "engineering",
+                    "Marketing Team": "marketing",
+                    "HR Team": "hr",
+                    "General": "general",
+                }
+                backend_role = role_map.get(st.session_state.role, "general")
+
+            # Render tokens as they arrive instead of waiting behind a spinner for the full answer
+            sources, timing = [], {}
+            resp = st.write_stream(stream_ai_response(prompt, backend_role, sources, timing))
+            render_sources(sources)
+            render_timing(timing)
         st.session_state.messages.append({'role': 'assistant', 'content': resp})
 
 # Main application flow based on session state
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class BatchingEmbedder:
+    """
+    Embeds a large list of texts as fixed-size batches on a bounded thread pool.
+
+    Each batch is one `embed_documents` call, i.e. one `/api/embed` request with
+    OllamaBatchEmbeddings. Up to `max_workers` batches are in flight against the embedding
+    server at once, a failed request is retried on its own with exponential backoff, and
+    finished batches are yielded as soon as they are ready so the caller can write them
+    out while the rest are still embedding.
+    """
+
+    def __init__(self, embeddings, batch_size=32, max_workers=4, max_retries=3, backoff_seconds=0.5):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.retries = 0
+
+    def _embed_with_retry(self, texts):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+
+    def embed_batches(self, texts):
+        """
+        Yield `(offset, vectors)` for each batch as it completes, where `vectors[i]` is the
+        embedding of `texts[offset + i]`. Batches may complete out of order. At most
+        2 * max_workers batches are queued at a time to keep memory bounded.
+        """
+        offsets = iter(range(0, len(texts), self.batch_size))
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="embed") as pool:
+            pending = {}
+
+            def submit_next():
+                offset = next(offsets, None)
+                if offset is not None:
+                    future = pool.submit(self._embed_with_retry, texts[offset:offset + self.batch_size])
+                    pending[future] = offset
+
+            for _ in range(2 * self.max_workers):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    offset = pending.pop(future)
+                    yield offset, future.result()
+                    submit_next()
+
+    def embed_documents(self, texts):
+        """Embed everything and return the vectors in input order."""
+        vectors = [None] * len(texts)
+        for offset, batch_vectors in self.embed_batches(texts):
+            vectors[offset:offset + len(batch_vectors)] = batch_vectors
+        return vectors
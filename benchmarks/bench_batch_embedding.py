@@ -0,0 +1,74 @@
+"""
+Compare serial OllamaEmbeddings.embed_documents (one `/api/embeddings` call per text)
+with BatchingEmbedder over OllamaBatchEmbeddings (one `/api/embed` call per batch).
+
+Runs against the fake Ollama server, which sleeps `--latency` seconds per HTTP call
+like a real embedding server under load, so the numbers show how much of ingestion
+time is spent waiting on sequential round trips:
+
+    python benchmarks/bench_batch_embedding.py --texts 2000 --latency 0.01
+    python benchmarks/bench_batch_embedding.py --error-rate 0.005   # exercise retries
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_community.embeddings import OllamaEmbeddings  # noqa: E402
+
+from batch_embedder import BatchingEmbedder  # noqa: E402
+from fake_servers import base_url, start_fake_ollama  # noqa: E402
+from ollama_embeddings import OllamaBatchEmbeddings  # noqa: E402
+
+
+def make_texts(n):
+    # One sentence per employee, like the HR store built from hr_data.csv
+    return [
+        f"Employee FINEMP{1000 + i} is an analyst in the Finance department with {i % 30} days of leave remaining."
+        for i in range(n)
+    ]
+
+
+def timed(embed, texts):
+    start = time.perf_counter()
+    vectors = embed(texts)
+    seconds = time.perf_counter() - start
+    assert len(vectors) == len(texts)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake server seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = start_fake_ollama(latency=args.latency, error_rate=args.error_rate)
+    embeddings = OllamaEmbeddings(model="nomic-embed-text", base_url=base_url(server))
+    batch_embeddings = OllamaBatchEmbeddings(model="nomic-embed-text", base_url=base_url(server))
+    texts = make_texts(args.texts)
+
+    rows = []
+    if args.error_rate == 0:
+        # The serial baseline has no retries, so it only runs without injected failures
+        rows.append(("serial embed_documents", timed(embeddings.embed_documents, texts), 0))
+    for workers in args.concurrency:
+        embedder = BatchingEmbedder(batch_embeddings, batch_size=args.batch_size, max_workers=workers,
+                                    backoff_seconds=0.01)
+        rows.append((f"batched, {workers} in flight", timed(embedder.embed_documents, texts), embedder.retries))
+    server.shutdown()
+
+    baseline = rows[0][1] if args.error_rate == 0 else None
+    print(f"{'mode':<26}{'seconds':>10}{'embeddings/sec':>16}{'speedup':>9}{'retries':>9}")
+    for name, seconds, retries in rows:
+        speedup = f"{baseline / seconds:.1f}x" if baseline else "-"
+        print(f"{name:<26}{seconds:>10.2f}{len(texts) / seconds:>16.1f}{speedup:>9}{retries:>9}")
+
+
+if __name__ == "__main__":
+    main()
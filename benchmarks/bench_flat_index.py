@@ -0,0 +1,119 @@
+"""
+Compare the NumPy flat index (flat_index.py) with Chroma for department-sized stores.
+
+For each size, random unit-norm 768-d embeddings are written to a temporary Chroma
+store and exported to the flat format the way ingest.py does. Queries are noisy
+copies of stored vectors. Reported per size:
+
+- Chroma and flat top-k latency (p50/p95), through the same calls the backend makes
+- time to answer all queries in one batch (Chroma `collection.query` vs one matrix product)
+- Chroma's recall@k against the flat index, which is exact
+- flat export and load times
+
+    python benchmarks/bench_flat_index.py --sizes 1000 10000 100000 --queries 200 --k 5
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import chromadb  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+
+from flat_index import FlatIndex  # noqa: E402
+from ingest import COLLECTION_NAME  # noqa: E402
+from local_embeddings import HashingEmbeddings  # noqa: E402
+
+ADD_BATCH_SIZE = 5000
+
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def build_chroma(store_dir, vectors):
+    collection = chromadb.PersistentClient(path=store_dir).get_or_create_collection(
+        COLLECTION_NAME, embedding_function=None
+    )
+    for start in range(0, len(vectors), ADD_BATCH_SIZE):
+        rows = range(start, min(start + ADD_BATCH_SIZE, len(vectors)))
+        collection.add(
+            ids=[f"chunk-{i}" for i in rows],
+            documents=[f"chunk {i}" for i in rows],
+            metadatas=[{"source": "synthetic", "row": i} for i in rows],
+            embeddings=vectors[rows.start:rows.stop].tolist()
+        )
+    return collection
+
+
+def time_each(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'chunks':>8}{'chroma p50':>12}{'chroma p95':>12}{'flat p50':>10}{'flat p95':>10}"
+          f"{'chroma batch':>14}{'flat batch':>12}{'recall@k':>10}{'export s':>10}{'load ms':>9}")
+    for size in args.sizes:
+        vectors = unit(rng.standard_normal((size, args.dimensions)).astype(np.float32))
+        picks = rng.integers(0, size, args.queries)
+        queries = unit(vectors[picks] + 0.5 * rng.standard_normal((args.queries, args.dimensions)).astype(np.float32))
+        query_lists = queries.tolist()
+
+        with tempfile.TemporaryDirectory() as store_dir:
+            collection = build_chroma(store_dir, vectors)
+            export_seconds, _ = timed(lambda: FlatIndex.export(collection, store_dir))
+            load_seconds, flat = timed(lambda: FlatIndex.load(store_dir))
+            # Same wrapper the backend uses; the embedder is never called for vector queries
+            chroma = Chroma(persist_directory=store_dir, embedding_function=HashingEmbeddings(args.dimensions))
+
+            chroma_p50, chroma_p95 = time_each(
+                lambda query: chroma.similarity_search_by_vector(query, k=args.k), query_lists
+            )
+            flat_p50, flat_p95 = time_each(
+                lambda query: flat.similarity_search_by_vector(query, k=args.k), query_lists
+            )
+            chroma_batch, chroma_results = timed(
+                lambda: collection.query(query_embeddings=query_lists, n_results=args.k, include=["metadatas"])
+            )
+            flat_batch, flat_results = timed(lambda: flat.search_batch(queries, args.k))
+
+        found = 0
+        for chroma_metadatas, flat_scored in zip(chroma_results["metadatas"], flat_results):
+            exact = {doc.metadata["row"] for doc, _ in flat_scored}
+            found += len(exact & {metadata["row"] for metadata in chroma_metadatas})
+        recall = found / (args.k * args.queries)
+
+        print(f"{size:>8}{chroma_p50:>12.2f}{chroma_p95:>12.2f}{flat_p50:>10.2f}{flat_p95:>10.2f}"
+              f"{chroma_batch * 1000:>12.1f}ms{flat_batch * 1000:>10.1f}ms{recall:>10.3f}"
+              f"{export_seconds:>10.2f}{load_seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
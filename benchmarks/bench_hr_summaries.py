@@ -0,0 +1,108 @@
+"""
+Compare the old per-row HR summary builder with the columnar one in hr_records.py.
+
+The old builder ran `df.apply(row_to_sentence_full, axis=1)`, parsing and formatting
+three dates per row in Python. The columnar builder parses each date column once.
+Both run on synthetic HR exports shaped like hr_data.csv, with a few blank cells (the
+top manager has no manager_id), and their output is checked to be identical:
+
+    python benchmarks/bench_hr_summaries.py --rows 10000 100000 1000000
+
+The per-row builder is skipped above --legacy-limit rows, since at 1M rows it takes minutes.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from hr_records import build_hr_summaries, iter_hr_summaries  # noqa: E402
+
+
+def row_to_sentence_full(row):
+    """The original per-row builder from the HR chunking script."""
+    return (
+        f"{row['full_name']} (Employee ID: {row['employee_id']}) is a {row['role']} in the {row['department']} department, "
+        f"location: {row['location']}. They joined FinTechCo on {pd.to_datetime(row['date_of_joining']).strftime('%B %d, %Y')} "
+        f"and were born on {pd.to_datetime(row['date_of_birth']).strftime('%B %d, %Y')}. Their email is {row['email']}, and their "
+        f"manager is identified by Employee ID {row['manager_id']}. They earn an annual salary of ₹{row['salary']:,.2f}. "
+
+        f"As of the last performance review on {pd.to_datetime(row['last_review_date']).strftime('%B %d, %Y')}, "
+        f"they hold a performance rating of {row['performance_rating']}. Their attendance rate stands at {row['attendance_pct']}%, "
+        f"with {row['leaves_taken']} leaves taken and {row['leave_balance']} days of leave remaining."
+    )
+
+
+def make_hr_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"FINEMP{1000 + i}" for i in range(rows)])
+
+    def dates(start, span_days):
+        offsets = rng.integers(0, span_days, rows)
+        return (pd.Timestamp(start) + pd.to_timedelta(offsets, unit="D")).strftime("%Y-%m-%d")
+
+    df = pd.DataFrame({
+        "employee_id": ids,
+        "full_name": [f"Employee {i}" for i in range(rows)],
+        "role": rng.choice(["Analyst", "Engineer", "Manager", "Designer"], rows),
+        "department": rng.choice(["Finance", "HR", "Marketing", "Technology"], rows),
+        "email": [f"employee{i}@fintechco.com" for i in range(rows)],
+        "location": rng.choice(["Mumbai", "Bangalore", "Pune", "Delhi"], rows),
+        "date_of_birth": dates("1965-01-01", 12000),
+        "date_of_joining": dates("2010-01-01", 5000),
+        "manager_id": rng.choice(ids[: max(1, rows // 10)], rows),
+        "salary": rng.uniform(300_000, 5_000_000, rows).round(2),
+        "leave_balance": rng.integers(0, 30, rows),
+        "leaves_taken": rng.integers(0, 30, rows),
+        "attendance_pct": rng.uniform(80, 100, rows).round(2),
+        "performance_rating": rng.integers(1, 6, rows),
+        "last_review_date": dates("2023-01-01", 700),
+    })
+    # Blank cells as in real exports; the old builder wrote them as "nan"
+    df.loc[0, "manager_id"] = np.nan
+    df.loc[rows // 2, ["location", "salary"]] = np.nan
+    return df
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=100_000)
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="frame size for the streaming CSV pass")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'df.apply (s)':>14}{'columnar (s)':>14}{'speedup':>9}{'streamed CSV (s)':>18}")
+    for rows in args.rows:
+        df = make_hr_frame(rows)
+        columnar_seconds, columnar = timed(lambda: build_hr_summaries(df))
+
+        legacy = "-"
+        speedup = "-"
+        if rows <= args.legacy_limit:
+            legacy_seconds, expected = timed(lambda: df.apply(row_to_sentence_full, axis=1))
+            assert expected.tolist() == columnar.tolist(), "columnar builder output differs from df.apply"
+            legacy = f"{legacy_seconds:.2f}"
+            speedup = f"{legacy_seconds / columnar_seconds:.0f}x"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "hr_data.csv"
+            df.to_csv(path, index=False)
+            streamed_seconds, count = timed(lambda: sum(1 for _ in iter_hr_summaries(path, args.chunk_rows)))
+            assert count == rows
+
+        print(f"{rows:>10}{legacy:>14}{columnar_seconds:>14.2f}{speedup:>9}{streamed_seconds:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
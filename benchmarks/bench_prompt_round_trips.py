@@ -0,0 +1,107 @@
+"""
+Compare the old two-call prompt flow with the single-request prompt builder.
+
+The old c-level.py flow opened a chat, sent the retrieved context as one message
+and the user query as a second one, so every question cost two Gemini round trips
+and the second call re-sent the context as chat history. `prompts.build_request`
+sends instructions + context + query once.
+
+Both flows run through the real `google.genai` client against a local fake Gemini
+server, so no API key or network access is needed:
+
+    python benchmarks/bench_prompt_round_trips.py --queries 20 --latency 0.3
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from google.genai import Client, types  # noqa: E402
+
+from fake_servers import base_url, start_fake_gemini  # noqa: E402
+from prompts import GEMINI_MODEL, build_request, format_context  # noqa: E402
+
+QUERIES = [
+    "What is the leave policy?",
+    "What were the main revenue drivers this quarter?",
+    "Which marketing campaigns ran in Q3 2024?",
+    "Who is the manager of employee FINEMP1003?",
+]
+
+
+def make_docs(k, chunk_chars):
+    paragraph = "FinSolve reported steady growth in digital lending and payments. "
+    text = (paragraph * (chunk_chars // len(paragraph) + 1))[:chunk_chars]
+    return [SimpleNamespace(page_content=text) for _ in range(k)]
+
+
+def two_call_flow(client, docs, user_query):
+    chat = client.chats.create(model=GEMINI_MODEL)
+    first = chat.send_message(
+        f"""
+        You are an intelligent AI assistant. Answer the user's question only from the provided context.
+        If the information is not found, say 'The document does not contain that detail.'
+        Context: {format_context(docs)}
+        """
+    )
+    second = chat.send_message(user_query, config=types.GenerateContentConfig(temperature=0.0))
+    return [first, second]
+
+
+def single_call_flow(client, docs, user_query):
+    return [client.models.generate_content(**build_request(docs, user_query))]
+
+
+def run(flow, client, docs, n):
+    latencies, prompt_tokens, calls = [], [], []
+    for i in range(n):
+        start = time.perf_counter()
+        responses = flow(client, docs, QUERIES[i % len(QUERIES)])
+        latencies.append(time.perf_counter() - start)
+        prompt_tokens.append(sum(r.usage_metadata.prompt_token_count for r in responses))
+        calls.append(len(responses))
+    return {
+        "calls/query": statistics.mean(calls),
+        "mean latency (s)": statistics.mean(latencies),
+        "p50 latency (s)": statistics.median(latencies),
+        "prompt tokens/query": statistics.mean(prompt_tokens),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=3, help="retrieved chunks per query")
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake Gemini seconds per call")
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0001)
+    args = parser.parse_args()
+
+    server = start_fake_gemini(latency=args.latency, prompt_token_latency=args.prompt_token_latency)
+    client = Client(api_key="fake-key", http_options=types.HttpOptions(base_url=base_url(server)))
+    docs = make_docs(args.k, args.chunk_chars)
+
+    results = {
+        "two calls (old)": run(two_call_flow, client, docs, args.queries),
+        "single request": run(single_call_flow, client, docs, args.queries),
+    }
+    server.shutdown()
+
+    metrics = list(next(iter(results.values())))
+    print(f"{'flow':<18}" + "".join(f"{m:>22}" for m in metrics))
+    for name, row in results.items():
+        print(f"{name:<18}" + "".join(f"{row[m]:>22.3f}" for m in metrics))
+
+    old, new = results["two calls (old)"], results["single request"]
+    print(
+        f"\nlatency reduction: {1 - new['mean latency (s)'] / old['mean latency (s)']:.1%}, "
+        f"prompt token reduction: {1 - new['prompt tokens/query'] / old['prompt tokens/query']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure what the rerank stage costs in latency and what it saves in context tokens.
+
+Each synthetic question gets --fetch-k candidate chunks, as the over-fetch from a
+department store would return them: one chunk answers the question and sits at a
+random rank, the rest are on-topic filler. Without reranking, the answer only reaches
+Gemini if all --fetch-k chunks are sent; with reranking only the best --top-n are.
+The table reports, per reranker:
+
+- rerank latency per question with an empty score cache and a warm one,
+- how often the answering chunk lands in the top N,
+- context tokens sent per question, compared with sending every candidate.
+
+    python benchmarks/bench_rerank.py --queries 200 --fetch-k 20 --top-n 3
+
+The cross-encoder row is skipped when sentence-transformers is not installed.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from context_packer import estimate_tokens  # noqa: E402
+from rerankers import RERANKERS  # noqa: E402
+
+TOPICS = [
+    ("leave balance", "employees carry forward unused leave balance into the next year"),
+    ("marketing spend", "marketing spend in Q3 2024 rose on digital campaigns"),
+    ("revenue growth", "revenue growth this quarter came from payments and lending"),
+    ("incident response", "the incident response runbook pages the on-call engineer first"),
+    ("expense approval", "expense approval above the limit needs a director sign-off"),
+]
+FILLER = (
+    "FinSolve publishes quarterly reports covering operations, headcount, vendors, "
+    "compliance reviews and planning assumptions for the coming year."
+).split()
+
+
+def make_case(rng, fetch_k, chunk_words):
+    topic, answer = rng.choice(TOPICS)
+    question = f"What does the policy say about {topic}?"
+    docs = []
+    for i in range(fetch_k):
+        words = rng.choices(FILLER, k=chunk_words)
+        words[rng.randrange(chunk_words)] = topic.split()[0]  # on-topic, but no answer
+        docs.append(Document(page_content=" ".join(words), metadata={"source": f"chunk-{i}"}))
+    relevant = rng.randrange(fetch_k)
+    docs[relevant] = Document(
+        page_content=" ".join(rng.choices(FILLER, k=chunk_words // 2)) + f" {answer}.",
+        metadata={"source": "answer"}
+    )
+    return question, docs
+
+
+def context_tokens(docs):
+    return sum(estimate_tokens(doc.page_content) for doc in docs)
+
+
+def run(reranker, cases, top_n):
+    timings = {"cold": [], "warm": []}
+    found, tokens = 0, []
+    for pass_name in ("cold", "warm"):
+        for question, docs in cases:
+            start = time.perf_counter()
+            ranked = reranker.rerank(question, docs, top_n)
+            timings[pass_name].append((time.perf_counter() - start) * 1000)
+            if pass_name == "cold":
+                found += any(doc.metadata["source"] == "answer" for doc in ranked)
+                tokens.append(context_tokens(ranked))
+    return timings, found / len(cases), statistics.mean(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--fetch-k", type=int, default=20, help="candidates fetched before reranking")
+    parser.add_argument("--top-n", type=int, default=3, help="chunks kept for generation")
+    parser.add_argument("--chunk-words", type=int, default=160)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [make_case(rng, args.fetch_k, args.chunk_words) for _ in range(args.queries)]
+    baseline_tokens = statistics.mean(context_tokens(docs) for _, docs in cases)
+    unranked_found = sum(
+        any(doc.metadata["source"] == "answer" for doc in docs[:args.top_n]) for _, docs in cases
+    ) / len(cases)
+
+    print(f"{args.queries} questions, {args.fetch_k} candidates each, keeping {args.top_n}")
+    print(f"sending all {args.fetch_k} candidates: {baseline_tokens:.0f} context tokens/question")
+    print(f"top {args.top_n} without reranking: answer found in {unranked_found:.0%} of questions\n")
+    print(f"{'reranker':>14}{'cold p50 ms':>13}{'cold p95 ms':>13}{'warm p50 ms':>13}"
+          f"{'answer in top N':>17}{'tokens/q':>10}{'tokens saved':>14}")
+    for name, reranker_class in RERANKERS.items():
+        try:
+            reranker = reranker_class(batch_size=args.batch_size)
+        except ImportError as e:
+            print(f"{name:>14}  skipped ({e})")
+            continue
+        timings, found, tokens = run(reranker, cases, args.top_n)
+        cold = sorted(timings["cold"])
+        print(
+            f"{name:>14}{statistics.median(cold):>13.2f}{cold[int(0.95 * (len(cold) - 1))]:>13.2f}"
+            f"{statistics.median(timings['warm']):>13.3f}{found:>17.0%}{tokens:>10.0f}"
+            f"{1 - tokens / baseline_tokens:>14.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Offline retrieval quality and latency benchmark over the department corpora.
+
+For every department and chunk size, the department's sources (from the ingestion
+manifest) are chunked exactly as ingest.py does, embedded with a deterministic local
+embedder (benchmarks/local_embeddings.py) into a temporary Chroma store with its BM25
+index, and the department's question set (benchmarks/questions/<department>.json) is
+run against it in each retrieval mode:
+
+    vector          Chroma similarity search
+    lexical         BM25 only
+    hybrid          vector + BM25 fused with reciprocal rank fusion, as the backend does
+    hybrid+rerank   hybrid over-fetch, then the lexical reranker keeps k
+
+A question lists `expected` phrases; a chunk is relevant when it contains all of them
+(case-insensitive). Reported per run: recall@k, MRR@k, p50/p95/p99 search latency and
+the index build time. Questions whose phrases appear in no chunk are counted as
+unanswerable and left out of recall and MRR, so a stale question set shows up instead
+of silently lowering the scores.
+
+    python benchmarks/bench_retrieval.py --data-dir data
+    python benchmarks/bench_retrieval.py --data-dir data --chunk-sizes 500 1000 1500 --k 3 5 --output run.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import chromadb  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+
+from bm25_index import BM25Index, reciprocal_rank_fusion  # noqa: E402
+from ingest import COLLECTION_NAME, DEFAULT_CHUNK_OVERLAP, chunk_department, chunk_ids  # noqa: E402
+from local_embeddings import HashingEmbeddings  # noqa: E402
+from metadata_filters import build_filter  # noqa: E402
+from query_pipeline import HYBRID_FETCH_MULTIPLIER, RERANK_FETCH_K  # noqa: E402
+from rerankers import LexicalReranker  # noqa: E402
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+MODES = ["vector", "lexical", "hybrid", "hybrid+rerank"]
+ADD_BATCH_SIZE = 1000
+
+
+def load_questions(questions_dir, department):
+    path = Path(questions_dir) / f"{department}.json"
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def is_relevant(text, expected):
+    text = text.lower()
+    return all(phrase.lower() in text for phrase in expected)
+
+
+def build_store(department, spec, data_dir, store_dir, chunk_size, chunk_overlap, embeddings):
+    """Chunk, embed and index one department. Returns (vectorstore, bm25 index, chunks, build seconds)."""
+    start = time.perf_counter()
+    chunks, metadatas = chunk_department(spec["files"], data_dir, chunk_size, chunk_overlap)
+    ids = chunk_ids(chunks, metadatas)
+    collection = chromadb.PersistentClient(path=store_dir).get_or_create_collection(
+        COLLECTION_NAME, embedding_function=None
+    )
+    vectors = embeddings.embed_documents(chunks)
+    for i in range(0, len(chunks), ADD_BATCH_SIZE):
+        collection.add(
+            ids=ids[i:i + ADD_BATCH_SIZE],
+            documents=chunks[i:i + ADD_BATCH_SIZE],
+            metadatas=metadatas[i:i + ADD_BATCH_SIZE],
+            embeddings=vectors[i:i + ADD_BATCH_SIZE]
+        )
+    lexical_index = BM25Index(ids, chunks, metadatas)
+    build_seconds = time.perf_counter() - start
+    vectorstore = Chroma(persist_directory=store_dir, embedding_function=embeddings)
+    return vectorstore, lexical_index, chunks, build_seconds
+
+
+def search(mode, vectorstore, lexical_index, reranker, query_vector, question, k, where):
+    if mode == "vector":
+        return vectorstore.similarity_search_by_vector(query_vector, k=k, filter=where)
+    if mode == "lexical":
+        return [doc for doc, _ in lexical_index.search(question, k, filter=where)]
+    fetch_k = max(RERANK_FETCH_K, k) if mode == "hybrid+rerank" else k
+    fused = reciprocal_rank_fusion([
+        vectorstore.similarity_search_by_vector(query_vector, k=fetch_k * HYBRID_FETCH_MULTIPLIER, filter=where),
+        [doc for doc, _ in lexical_index.search(question, fetch_k * HYBRID_FETCH_MULTIPLIER, filter=where)],
+    ], fetch_k)
+    if mode == "hybrid+rerank":
+        return reranker.rerank(question, fused, k)
+    return fused
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def evaluate(department, mode, k, questions, vectorstore, lexical_index, embeddings, answerable):
+    reranker = LexicalReranker(cache_size=0)  # repeated passes should not hit the score cache
+    latencies, reciprocal_ranks, hits = [], [], 0
+    for item in questions:
+        query_vector = embeddings.embed_query(item["question"])
+        where = build_filter(department, item["question"])
+        start = time.perf_counter()
+        results = search(mode, vectorstore, lexical_index, reranker, query_vector, item["question"], k, where)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not answerable(item):
+            continue
+        rank = next((i + 1 for i, doc in enumerate(results) if is_relevant(doc.page_content, item["expected"])), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    latencies.sort()
+    return {
+        "questions": len(questions),
+        "answerable": len(reciprocal_ranks),
+        "recall": hits / len(reciprocal_ranks) if reciprocal_ranks else None,
+        "mrr": statistics.mean(reciprocal_ranks) if reciprocal_ranks else None,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def format_score(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default=str(BENCHMARKS_DIR.parent / "ingest_manifest.json"))
+    parser.add_argument("--data-dir", default="data", help="directory the manifest paths are relative to")
+    parser.add_argument("--questions-dir", default=str(BENCHMARKS_DIR / "questions"))
+    parser.add_argument("--departments", nargs="*", help="only benchmark these departments")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP)
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--dimensions", type=int, default=512, help="local embedding dimensions")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each question set, for stable latencies")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.manifest, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    departments = args.departments or list(manifest)
+    embeddings = HashingEmbeddings(args.dimensions)
+
+    builds, runs = [], []
+    print(f"{'department':<12}{'chunk':>6}{'mode':>15}{'k':>3}{'answerable':>12}{'recall@k':>10}{'MRR@k':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for department in departments:
+        questions = load_questions(args.questions_dir, department)
+        if not questions:
+            print(f"{department:<12} no questions in {args.questions_dir}, skipped")
+            continue
+        missing = [name for name in manifest[department]["files"] if not (Path(args.data_dir) / name).exists()]
+        if missing:
+            print(f"{department:<12} missing sources in {args.data_dir} ({', '.join(missing)}), skipped")
+            continue
+        for chunk_size in args.chunk_sizes:
+            with tempfile.TemporaryDirectory() as store_dir:
+                vectorstore, lexical_index, chunks, build_seconds = build_store(
+                    department, manifest[department], args.data_dir, store_dir,
+                    chunk_size, args.chunk_overlap, embeddings
+                )
+                builds.append({"department": department, "chunk_size": chunk_size,
+                               "chunks": len(chunks), "build_seconds": build_seconds})
+                answerable_questions = {
+                    item["question"] for item in questions
+                    if any(is_relevant(chunk, item["expected"]) for chunk in chunks)
+                }
+
+                def answerable(item):
+                    return item["question"] in answerable_questions
+
+                for mode in args.modes:
+                    for k in args.k:
+                        result = evaluate(department, mode, k, questions * args.repeat,
+                                          vectorstore, lexical_index, embeddings, answerable)
+                        result["answerable"] //= args.repeat
+                        result["questions"] //= args.repeat
+                        runs.append({"department": department, "chunk_size": chunk_size, "mode": mode, "k": k, **result})
+                        print(
+                            f"{department:<12}{chunk_size:>6}{mode:>15}{k:>3}"
+                            f"{result['answerable']:>6}/{result['questions']:<5}{format_score(result['recall']):>10}"
+                            f"{format_score(result['mrr']):>8}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                            f"{result['p99_ms']:>9.2f}"
+                        )
+
+    print(f"\n{'department':<12}{'chunk':>6}{'chunks':>8}{'build (s)':>11}")
+    for build in builds:
+        print(f"{build['department']:<12}{build['chunk_size']:>6}{build['chunks']:>8}{build['build_seconds']:>11.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"builds": builds, "runs": runs}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Measure backend cold start: how long `uvicorn server:app` takes to accept connections
+and to be ready, and what the first query then costs.
+
+Stores are built once from a synthetic corpus against the fake Ollama (as in
+load_test.py). Each run then starts a fresh server process and reports:
+
+- import ms: `import server` in a fresh interpreter, i.e. module-level work
+- accept ms: process start until the first HTTP response
+- ready ms: process start until GET /health/ready returns 200 (stores warm)
+- first query ms: latency of the first POST /finance/query once ready
+
+Pass --record to append the medians, tagged with `git describe`, to a JSON-lines file
+so cold start can be tracked release over release:
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --record benchmarks/startup_history.jsonl
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+
+from fake_servers import base_url, start_fake_gemini, start_fake_ollama  # noqa: E402
+from load_test import write_synthetic_corpus  # noqa: E402
+
+POLL_INTERVAL = 0.1 # Tighter polling competes with the warm-up thread for the GIL
+
+
+def build_stores(work_dir, ollama, hr_rows):
+    with open(REPO_DIR / "ingest_manifest.json", "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    data_dir = os.path.join(work_dir, "data")
+    write_synthetic_corpus(manifest, data_dir, hr_rows)
+    subprocess.run(
+        [sys.executable, str(REPO_DIR / "ingest.py"), "--manifest", str(REPO_DIR / "ingest_manifest.json"),
+         "--data-dir", data_dir, "--store-dir", work_dir, "--ollama-url", base_url(ollama)],
+        check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def time_import(work_dir, env):
+    code = "import time; start = time.perf_counter(); import server; print(time.perf_counter() - start)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=work_dir, env={**env, "PYTHONPATH": str(REPO_DIR)},
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def start_once(work_dir, env, port, timeout):
+    """Start one server and time it until ready. Returns (accept_ms, ready_ms, first_query_ms)."""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--app-dir", str(REPO_DIR),
+         "--port", str(port), "--log-level", "warning"],
+        cwd=work_dir, env=env
+    )
+    accept_ms = None
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                status = httpx.get(f"{url}/health/ready", timeout=1).status_code
+            except httpx.HTTPError:
+                time.sleep(POLL_INTERVAL)
+                continue
+            if accept_ms is None:
+                accept_ms = (time.perf_counter() - start) * 1000
+            if status == 200:
+                break
+            time.sleep(POLL_INTERVAL)
+        else:
+            raise RuntimeError(f"server was not ready within {timeout}s")
+        ready_ms = (time.perf_counter() - start) * 1000
+
+        query_start = time.perf_counter()
+        httpx.post(f"{url}/finance/query", json={"query": "What were the main revenue drivers?"},
+                   timeout=timeout).raise_for_status()
+        return accept_ms, ready_ms, (time.perf_counter() - query_start) * 1000
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--hr-rows", type=int, default=500, help="employees in the synthetic HR CSV")
+    parser.add_argument("--record", help="append the medians to this JSON-lines file")
+    args = parser.parse_args()
+
+    gemini = start_fake_gemini(latency=0.05)
+    ollama = start_fake_ollama()
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "bench-startup",
+        "GEMINI_BASE_URL": base_url(gemini),
+        "OLLAMA_BASE_URL": base_url(ollama),
+    }
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            build_stores(work_dir, ollama, args.hr_rows)
+            for _ in range(args.runs):
+                import_ms = time_import(work_dir, env)
+                runs.append((import_ms, *start_once(work_dir, env, args.port, args.timeout)))
+    finally:
+        gemini.shutdown()
+        ollama.shutdown()
+
+    names = ["import_ms", "accept_ms", "ready_ms", "first_query_ms"]
+    medians = {name: round(statistics.median(run[i] for run in runs), 1) for i, name in enumerate(names)}
+    print(f"{'':>8}" + "".join(f"{name:>16}" for name in names))
+    for number, run in enumerate(runs, start=1):
+        print(f"{'run ' + str(number):>8}" + "".join(f"{value:>16.1f}" for value in run))
+    print(f"{'median':>8}" + "".join(f"{medians[name]:>16.1f}" for name in names))
+
+    if args.record:
+        entry = {
+            "version": git_version(),
+            "date": datetime.date.today().isoformat(),
+            "runs": args.runs,
+            **medians,
+        }
+        with open(args.record, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        print(f"Recorded in {args.record}")
+
+
+if __name__ == "__main__":
+    main()
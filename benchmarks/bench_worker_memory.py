@@ -0,0 +1,148 @@
+"""
+Measure the memory each uvicorn-style worker process spends on a department store,
+for the Chroma backend vs the memory-mapped flat + BM25 indexes.
+
+A synthetic store (random 768-d embeddings, ~800-character chunks) is built once and
+exported the way ingest.py does. Then, for each backend, --workers processes open it
+through VectorStoreRegistry at the same time, run --queries hybrid-style searches (vector +
+BM25), and report, after every worker has finished searching:
+
+- open ms: time until the store and the BM25 index are usable in a fresh worker
+- rss: resident memory added by opening and searching (shared pages counted in full)
+- pss: proportional share, shared pages divided between the workers mapping them
+- private: pages only this worker holds, i.e. what each extra worker really costs
+
+"chroma" is the previous setup: Chroma plus a BM25 index rebuilt in process memory.
+PSS and private memory come from /proc/<pid>/smaps_rollup, so this runs on Linux only.
+
+    python benchmarks/bench_worker_memory.py --chunks 50000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import chromadb  # noqa: E402
+
+from bench_flat_index import ADD_BATCH_SIZE, unit  # noqa: E402
+from bm25_index import BM25Index  # noqa: E402
+from flat_index import FlatIndex  # noqa: E402
+from ingest import COLLECTION_NAME  # noqa: E402
+from local_embeddings import HashingEmbeddings  # noqa: E402
+from mapped_records import MappedStrings  # noqa: E402
+
+WORDS = ("revenue margin quarter employee leave policy campaign budget latency service deploy "
+         "incident forecast vendor payroll benefits review roadmap churn audit").split()
+
+
+def memory_kb():
+    """Rss, Pss and Private_* totals of this process in kB."""
+    totals = {}
+    with open("/proc/self/smaps_rollup", "r") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                totals[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": totals["Rss"],
+        "pss": totals["Pss"],
+        "private": totals["Private_Clean"] + totals["Private_Dirty"],
+    }
+
+
+def build_store(store_dir, chunks, dimensions, seed):
+    rng = np.random.default_rng(seed)
+    vectors = unit(rng.standard_normal((chunks, dimensions)).astype(np.float32))
+    collection = chromadb.PersistentClient(path=store_dir).get_or_create_collection(
+        COLLECTION_NAME, embedding_function=None
+    )
+    for start in range(0, chunks, ADD_BATCH_SIZE):
+        rows = range(start, min(start + ADD_BATCH_SIZE, chunks))
+        collection.add(
+            ids=[f"chunk-{i}" for i in rows],
+            # Word salad of ~800 characters, so BM25 has realistic postings
+            documents=[" ".join(rng.choice(WORDS, 110)) + f" chunk{i}" for i in rows],
+            metadatas=[{"source": "synthetic", "row": i} for i in rows],
+            embeddings=vectors[rows.start:rows.stop].tolist()
+        )
+    FlatIndex.export(collection, store_dir)
+    BM25Index.from_collection(collection).save(store_dir)
+    return rng.standard_normal((64, dimensions)).astype(np.float32)
+
+
+def worker(backend, store_dir, dimensions, queries, query_vectors, barrier, results):
+    # Imported here so the baseline includes the libraries but not the store
+    from vectorstore_registry import VectorStoreRegistry
+
+    registry = VectorStoreRegistry(
+        HashingEmbeddings(dimensions), store_paths={"bench": store_dir}, backends={"bench": backend}
+    )
+    before = memory_kb()
+    start = time.perf_counter()
+    store = registry.get("bench")
+    if backend == "flat":
+        lexical = registry.lexical_index("bench")
+    else:
+        # What the backend did before the BM25 index was memory-mapped: rebuild it in the worker
+        documents = MappedStrings(os.path.join(store_dir, "bm25_documents"))
+        lexical = BM25Index(range(len(documents)), list(documents), [{}] * len(documents))
+    open_ms = (time.perf_counter() - start) * 1000
+
+    for i in range(queries):
+        store.similarity_search_by_vector(query_vectors[i % len(query_vectors)].tolist(), k=5)
+        lexical.search(" ".join(WORDS[i % len(WORDS):i % len(WORDS) + 3]), 5)
+
+    barrier.wait()  # every worker has its store mapped before anyone measures
+    after = memory_kb()
+    results.put({"open_ms": open_ms, **{key: (after[key] - before[key]) / 1024 for key in after}})
+    barrier.wait()  # stay alive until every worker has measured, so shared pages stay shared
+
+
+def run(backend, store_dir, args, query_vectors):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(backend, store_dir, args.dimensions, args.queries,
+                                             query_vectors, barrier, results))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        query_vectors = build_store(store_dir, args.chunks, args.dimensions, args.seed)
+        print(f"{args.chunks} chunks x {args.dimensions}d, {args.workers} workers (MB per worker, median)")
+        print(f"{'backend':>8}{'open ms':>10}{'rss':>9}{'pss':>9}{'private':>9}{'all workers pss':>17}")
+        for backend in ["chroma", "flat"]:
+            measured = run(backend, store_dir, args, query_vectors)
+            median = {key: statistics.median(result[key] for result in measured) for key in measured[0]}
+            total_pss = sum(result["pss"] for result in measured)
+            print(f"{backend:>8}{median['open_ms']:>10.1f}{median['rss']:>9.1f}{median['pss']:>9.1f}"
+                  f"{median['private']:>9.1f}{total_pss:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Local stand-ins for the external services used by the backend, for benchmarks.
+
+    python benchmarks/fake_servers.py gemini --port 8090 --latency 0.3
+    python benchmarks/fake_servers.py ollama --port 11434 --latency 0.02
+
+The fake Gemini server speaks enough of the REST API used by `google.genai`
+(`POST /v1beta/models/{model}:generateContent` and `:streamGenerateContent`) for a `Client` created with
+`http_options=types.HttpOptions(base_url=...)` to talk to it. Token counts are
+estimated at ~4 characters per token and reported in `usageMetadata`. It can also
+fail a configurable fraction of calls.
+
+The fake Ollama server answers `POST /api/embeddings` (one text, as called by
+`OllamaEmbeddings`) and `POST /api/embed` (a batch) with deterministic hash-based
+vectors, and can fail a configurable fraction of calls.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / 4)
+
+
+def _parts_text(content):
+    return "".join(part.get("text", "") for part in content.get("parts", []))
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    # Set on the server instance by `start_fake_gemini`
+    #   server.latency: fixed seconds per call
+    #   server.prompt_token_latency: extra seconds per prompt token (prefill cost)
+    #   server.stream_token_latency: seconds between streamed chunks
+    #   server.error_rate: fraction of calls answered with HTTP 500
+    #   server.answer: text returned for every call
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _prompt_tokens(self, payload):
+        system = payload.get("systemInstruction") or payload.get("system_instruction") or {}
+        text = _parts_text(system) + "".join(_parts_text(c) for c in payload.get("contents", []))
+        return estimate_tokens(text)
+
+    @staticmethod
+    def _response(text, prompt_tokens, answer_tokens, finished=True):
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": answer_tokens,
+                "totalTokenCount": prompt_tokens + answer_tokens,
+            },
+        }
+
+    def do_GET(self):
+        # models.get, used by the backend's warm-up to open a connection
+        model = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self._send_json(200, {"name": f"models/{model}", "displayName": model})
+
+    def do_POST(self):
+        streaming = ":streamGenerateContent" in self.path
+        if not streaming and ":generateContent" not in self.path:
+            self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+            return
+
+        payload = self._read_json()
+        prompt_tokens = self._prompt_tokens(payload)
+        time.sleep(self.server.latency + prompt_tokens * self.server.prompt_token_latency)
+
+        answer = self.server.answer
+        answer_tokens = estimate_tokens(answer)
+        with self.server.stats_lock:
+            self.server.calls += 1
+            self.server.prompt_tokens += prompt_tokens
+            failed = random.random() < self.server.error_rate
+            if failed:
+                self.server.errors += 1
+        if failed:
+            self._send_json(500, {"error": {"code": 500, "message": "injected failure", "status": "INTERNAL"}})
+            return
+
+        if not streaming:
+            self._send_json(200, self._response(answer, prompt_tokens, answer_tokens))
+            return
+
+        # `alt=sse` streaming: one event per word, the last one carrying finishReason
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = answer.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            text = word if last else word + " "
+            event = self._response(text, prompt_tokens, answer_tokens, finished=last)
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.stream_token_latency)
+
+
+def fake_embedding(text, dimensions):
+    """Deterministic pseudo-embedding derived from a hash of the text."""
+    values = []
+    seed = text.encode("utf-8")
+    while len(values) < dimensions:
+        seed = hashlib.sha256(seed).digest()
+        values.extend(byte / 127.5 - 1.0 for byte in seed)
+    return values[:dimensions]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    # Set on the server instance by `start_fake_ollama`
+    #   server.latency: fixed seconds per call
+    #   server.item_latency: extra seconds per embedded text
+    #   server.error_rate: fraction of calls answered with HTTP 500
+    #   server.dimensions: embedding size
+
+    def log_message(self, format, *args):
+        pass
+
+    _read_json = FakeGeminiHandler._read_json
+    _send_json = FakeGeminiHandler._send_json
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.path == "/api/embeddings":
+            # Legacy single-text endpoint used by langchain_community's OllamaEmbeddings
+            texts = [payload.get("prompt", "")]
+        elif self.path == "/api/embed":
+            inputs = payload.get("input", "")
+            texts = inputs if isinstance(inputs, list) else [inputs]
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        time.sleep(self.server.latency + len(texts) * self.server.item_latency)
+        with self.server.stats_lock:
+            self.server.calls += 1
+            failed = random.random() < self.server.error_rate
+            if failed:
+                self.server.errors += 1
+        if failed:
+            self._send_json(500, {"error": "injected failure"})
+            return
+
+        vectors = [fake_embedding(text, self.server.dimensions) for text in texts]
+        if self.path == "/api/embeddings":
+            self._send_json(200, {"embedding": vectors[0]})
+        else:
+            self._send_json(200, {"model": payload.get("model"), "embeddings": vectors})
+
+
+def _serve(handler, port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stats_lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def start_fake_gemini(port=0, latency=0.3, prompt_token_latency=0.0001, stream_token_latency=0.02,
+                      answer="The document does not contain that detail.", error_rate=0.0):
+    """Start the fake Gemini server on a background thread and return it."""
+    server = _serve(FakeGeminiHandler, port)
+    server.latency = latency
+    server.prompt_token_latency = prompt_token_latency
+    server.stream_token_latency = stream_token_latency
+    server.error_rate = error_rate
+    server.answer = answer
+    server.calls = 0
+    server.errors = 0
+    server.prompt_tokens = 0
+    return server
+
+
+def start_fake_ollama(port=0, latency=0.02, item_latency=0.0, error_rate=0.0, dimensions=768):
+    """Start the fake Ollama embedding server on a background thread and return it."""
+    server = _serve(FakeOllamaHandler, port)
+    server.latency = latency
+    server.item_latency = item_latency
+    server.error_rate = error_rate
+    server.dimensions = dimensions
+    server.calls = 0
+    server.errors = 0
+    return server
+
+
+def base_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("service", choices=["gemini", "ollama"])
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.3, help="fixed seconds per call")
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0001,
+                        help="gemini: extra seconds per prompt token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls failing with 500")
+    args = parser.parse_args()
+
+    if args.service == "gemini":
+        server = start_fake_gemini(args.port, args.latency, args.prompt_token_latency, error_rate=args.error_rate)
+    else:
+        server = start_fake_ollama(args.port, args.latency, error_rate=args.error_rate)
+    print(f"Fake {args.service} listening on {base_url(server)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
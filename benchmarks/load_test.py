@@ -0,0 +1,297 @@
+"""
+Load-test the query endpoints at a target request rate, without Gemini or Ollama.
+
+By default the whole setup runs locally:
+
+1. a fake Gemini and a fake Ollama server are started (benchmarks/fake_servers.py),
+   with configurable latency and injected error rates;
+2. a synthetic corpus is written for every department in the ingestion manifest,
+   unless --data-dir points at the real sources, and ingest.py builds the stores
+   against the fake Ollama;
+3. `uvicorn server:app` is started with GEMINI_BASE_URL / OLLAMA_BASE_URL pointing
+   at the fakes.
+
+The load generator then sends requests open-loop at --rps for --duration seconds,
+spread over the --paths, so slow responses do not slow the arrival rate. Meanwhile
+it probes GET /stores/stats, a handler that does nothing but run on the server's
+event loop, to estimate event-loop lag. It reports throughput, latency percentiles
+and errors overall and per path.
+
+    python benchmarks/load_test.py --rps 20 --duration 30
+    python benchmarks/load_test.py --rps 50 --gemini-latency 0.8 --gemini-error-rate 0.01 --workers 2
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --rps 10   # an already running server
+
+Every query is made unique, so the embedding and answer caches do not hide the
+backend's cost; pass --cacheable to replay a fixed set of questions instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+
+from bench_hr_summaries import make_hr_frame  # noqa: E402
+from fake_servers import base_url, start_fake_gemini, start_fake_ollama  # noqa: E402
+
+DEFAULT_PATHS = [
+    "/finance/query", "/marketing/query", "/hr/query", "/engineering/query", "/general/query",
+    "/c-level/finance/query", "/c-level/all/query",
+]
+QUESTIONS = [
+    "What were the main revenue drivers this quarter?",
+    "Which marketing campaigns ran in Q3 2024?",
+    "What is the leave balance of FINEMP1003?",
+    "How is customer data encrypted?",
+    "What is the leave policy?",
+]
+FILLER = (
+    "FinSolve reported steady growth in digital lending and payments while marketing "
+    "campaigns, engineering platform work and employee policies evolved across the year"
+).split()
+
+
+def write_synthetic_corpus(manifest, data_dir, hr_rows, seed=0):
+    """Write a filler document for every source file in the manifest."""
+    rng = random.Random(seed)
+    for spec in manifest.values():
+        for relative_path in spec["files"]:
+            path = Path(data_dir) / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.suffix == ".csv":
+                make_hr_frame(hr_rows, seed).to_csv(path, index=False)
+            else:
+                paragraphs = [" ".join(rng.choices(FILLER, k=120)) for _ in range(40)]
+                path.write_text(f"# {path.stem}\n\n" + "\n\n".join(paragraphs), encoding="utf-8")
+
+
+def wait_until_ready(url, process, timeout=60):
+    """Wait for GET /health/ready to return 200, so the load doesn't start before the stores are warm."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} was not ready within {timeout}s")
+
+
+def start_stack(args, work_dir):
+    """Start the fakes, build the stores and launch the backend. Returns (url, process, fakes)."""
+    gemini = start_fake_gemini(latency=args.gemini_latency, error_rate=args.gemini_error_rate)
+    ollama = start_fake_ollama(latency=args.ollama_latency, error_rate=args.ollama_error_rate)
+
+    with open(REPO_DIR / "ingest_manifest.json", "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    data_dir = args.data_dir
+    if data_dir is None:
+        data_dir = os.path.join(work_dir, "data")
+        write_synthetic_corpus(manifest, data_dir, args.hr_rows)
+
+    # Stores are built while the fake Ollama does not fail, then error injection starts
+    ollama.error_rate = 0.0
+    subprocess.run(
+        [sys.executable, str(REPO_DIR / "ingest.py"), "--manifest", str(REPO_DIR / "ingest_manifest.json"),
+         "--data-dir", data_dir, "--store-dir", work_dir, "--ollama-url", base_url(ollama)],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    ollama.error_rate = args.ollama_error_rate
+    ollama.calls = 0
+
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "load-test",
+        "GEMINI_BASE_URL": base_url(gemini),
+        "OLLAMA_BASE_URL": base_url(ollama),
+    }
+    url = f"http://127.0.0.1:{args.port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--app-dir", str(REPO_DIR),
+         "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=work_dir, env=env
+    )
+    wait_until_ready(url, process)
+    return url, process, (gemini, ollama)
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    values = sorted(values)
+
+    def at(q):
+        return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+    return {"p50": at(0.50), "p90": at(0.90), "p95": at(0.95), "p99": at(0.99), "max": values[-1]}
+
+
+class LoadResult:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # path -> seconds, successful requests only
+        self.errors = defaultdict(Counter)  # path -> error kind -> count
+        self.sent = Counter()
+        self.send_delays = []  # how late the generator sent each request (client-side lag)
+        self.probe_latencies = []
+
+    def record(self, path, seconds=None, error=None):
+        if error:
+            self.errors[path][error] += 1
+        else:
+            self.latencies[path].append(seconds)
+
+
+async def send_query(client, path, query, result):
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json={"query": query})
+    except httpx.TimeoutException:
+        result.record(path, error="timeout")
+        return
+    except httpx.HTTPError as e:
+        result.record(path, error=type(e).__name__)
+        return
+    seconds = time.perf_counter() - start
+    if response.status_code != 200:
+        result.record(path, error=f"HTTP {response.status_code}")
+    elif "error" in response.json():
+        result.record(path, error="error in body")
+    else:
+        result.record(path, seconds)
+
+
+async def probe_event_loop(client, result, interval, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/stores/stats")
+            result.probe_latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def run_load(url, paths, rps, duration, timeout, cacheable, probe_interval, seed=0):
+    rng = random.Random(seed)
+    result = LoadResult()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client, \
+            httpx.AsyncClient(base_url=url, timeout=timeout) as probe_client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_event_loop(probe_client, result, probe_interval, stop))
+        tasks = []
+        start = time.perf_counter()
+        total = int(rps * duration)
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            result.send_delays.append(max(0.0, time.perf_counter() - scheduled))
+            path = paths[i % len(paths)]
+            query = rng.choice(QUESTIONS)
+            if not cacheable:
+                query = f"{query} (request {i})"
+            result.sent[path] += 1
+            tasks.append(asyncio.create_task(send_query(client, path, query, result)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+    return result, elapsed
+
+
+def print_report(result, elapsed, rps):
+    all_latencies = [seconds for values in result.latencies.values() for seconds in values]
+    total_errors = sum(sum(counter.values()) for counter in result.errors.values())
+    sent = sum(result.sent.values())
+    print(f"\nsent {sent} requests at {rps} rps target, finished in {elapsed:.1f}s")
+    print(f"throughput: {len(all_latencies) / elapsed:.1f} successful req/s, "
+          f"errors: {total_errors} ({total_errors / sent:.1%})" if sent else "nothing sent")
+
+    print(f"\n{'path':<26}{'sent':>6}{'ok':>6}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}"
+          f"{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for path in sorted(result.sent):
+        stats = percentiles(result.latencies[path])
+        errors = sum(result.errors[path].values())
+        print(f"{path:<26}{result.sent[path]:>6}{len(result.latencies[path]):>6}{errors:>8}"
+              + "".join(f"{stats[key] * 1000:>9.0f}" for key in ("p50", "p90", "p95", "p99", "max")))
+    stats = percentiles(all_latencies)
+    print(f"{'all':<26}{sent:>6}{len(all_latencies):>6}{total_errors:>8}"
+          + "".join(f"{stats[key] * 1000:>9.0f}" for key in ("p50", "p90", "p95", "p99", "max")))
+
+    errors = Counter()
+    for counter in result.errors.values():
+        errors.update(counter)
+    if errors:
+        print("\nerrors: " + ", ".join(f"{kind} x{count}" for kind, count in errors.most_common()))
+
+    probe = percentiles(result.probe_latencies)
+    lag = percentiles(result.send_delays)
+    print(f"\nserver event-loop lag (GET /stores/stats probe, {len(result.probe_latencies)} samples): "
+          f"p50 {probe['p50'] * 1000:.1f} ms, p99 {probe['p99'] * 1000:.1f} ms, max {probe['max'] * 1000:.1f} ms")
+    print(f"load generator send delay: p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms"
+          + ("  (generator saturated, results understate the target rate)" if lag["p99"] > 0.05 else ""))
+    if all_latencies:
+        print(f"mean latency {statistics.mean(all_latencies) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load-test an already running server instead of starting one")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="endpoints to spread the load over")
+    parser.add_argument("--rps", type=float, default=20, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--timeout", type=float, default=30, help="client timeout per request")
+    parser.add_argument("--cacheable", action="store_true", help="replay a fixed question set (cache hits)")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="seconds between event-loop probes")
+    stack = parser.add_argument_group("local stack (ignored with --url)")
+    stack.add_argument("--port", type=int, default=8765)
+    stack.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    stack.add_argument("--data-dir", help="real department sources; a synthetic corpus is used otherwise")
+    stack.add_argument("--hr-rows", type=int, default=500, help="employees in the synthetic HR CSV")
+    stack.add_argument("--gemini-latency", type=float, default=0.3)
+    stack.add_argument("--gemini-error-rate", type=float, default=0.0)
+    stack.add_argument("--ollama-latency", type=float, default=0.02)
+    stack.add_argument("--ollama-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    process, fakes = None, ()
+    with tempfile.TemporaryDirectory() as work_dir:
+        try:
+            url = args.url
+            if url is None:
+                print("Building stores and starting the backend against fake Gemini and Ollama...")
+                url, process, fakes = start_stack(args, work_dir)
+            result, elapsed = asyncio.run(run_load(
+                url, args.paths, args.rps, args.duration, args.timeout, args.cacheable, args.probe_interval
+            ))
+            print_report(result, elapsed, args.rps)
+            if fakes:
+                gemini, ollama = fakes
+                print(f"fake Gemini: {gemini.calls} calls, {gemini.errors} injected errors; "
+                      f"fake Ollama: {ollama.calls} calls, {ollama.errors} injected errors")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            for fake in fakes:
+                fake.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Deterministic local embedder for benchmarks: no Ollama, no model download.
+
+Texts are embedded by feature hashing their unigrams and bigrams into a fixed number
+of dimensions, then L2-normalized. Texts sharing words end up close together, so
+retrieval rankings are meaningful enough to compare chunking and retrieval settings,
+and the same text always gets the same vector on every machine.
+"""
+import hashlib
+import math
+import sys
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bm25_index import tokenize  # noqa: E402
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+
+    def _bucket(self, feature):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimensions, 1.0 if value >> 63 else -1.0
+
+    def _embed(self, text):
+        tokens = tokenize(text)
+        vector = [0.0] * self.dimensions
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
@@ -0,0 +1,206 @@
+import json
+import math
+import os
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+from functools import partial
+from operator import itemgetter
+
+import numpy as np
+from langchain_core.documents import Document
+
+import mapped_records
+from answer_cache import chunk_id
+from mapped_records import MappedJsonRecords, MappedStrings
+from metadata_filters import MetadataColumns, matches
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercased alphanumeric tokens, so ids like FINEMP1003 and 'Q3 2024' survive intact."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-process Okapi BM25 inverted index over one department's chunks.
+
+    Built at ingestion time and saved next to the Chroma files (`<store>/bm25_*`), then
+    opened by the backend as a MappedBM25Index, where it complements vector search on
+    exact tokens such as employee ids, quarter names and metric names.
+    """
+
+    FILE_NAME = "bm25_params.json" # Written last by save(), so it marks a complete index
+    COLUMNS_PREFIX = "bm25_metadata_columns"
+
+    def __init__(self, ids, documents, metadatas, k1=1.5, b=0.75):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [metadata or {} for metadata in metadatas]
+        self.k1 = k1
+        self.b = b
+
+        self.postings = {}  # term -> list of (document index, term frequency)
+        self.lengths = []
+        for index, text in enumerate(self.documents):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings.setdefault(term, []).append((index, frequency))
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def _idf(self, term):
+        document_frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _scores(self, query):
+        """BM25 score of every document sharing a term with the query, as {document index: score}."""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self._idf(term)
+            for index, frequency in self.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.average_length)
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def _ranked(self, query, k, filter):
+        """Up to k `(document index, score)` pairs, best first, among the rows `filter` keeps."""
+        scores = self._scores(query)
+        if filter is not None:
+            scores = {index: score for index, score in scores.items() if matches(self.metadatas[index], filter)}
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+    def search(self, query, k, filter=None):
+        """Return up to k `(Document, score)` pairs, best first, restricted by a metadata `filter`."""
+        return [
+            (Document(page_content=self.documents[index], metadata=self.metadatas[index]), score)
+            for index, score in self._ranked(query, k, filter)
+        ]
+
+    def save(self, directory):
+        """
+        Save the index with its postings already built, in the memory-mapped layout
+        MappedBM25Index reads: sorted terms and the texts/metadata as mapped_records
+        tables, NumPy arrays for the term offsets, postings and document lengths, and
+        the metadata as MetadataColumns for filtering.
+        """
+        terms = sorted(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(self.postings[term])
+        postings = np.array(
+            [posting for term in terms for posting in self.postings[term]], dtype=np.int32
+        ).reshape(-1, 2)
+        path = partial(os.path.join, directory)
+        mapped_records.write_strings(path("bm25_terms"), terms)
+        mapped_records.write_strings(path("bm25_documents"), self.documents)
+        mapped_records.write_json_records(path("bm25_metadatas"), self.metadatas)
+        MetadataColumns.build(self.metadatas).save(path(self.COLUMNS_PREFIX))
+        for name, array in [("bm25_term_offsets", offsets), ("bm25_postings", postings),
+                            ("bm25_lengths", np.asarray(self.lengths, dtype=np.float32))]:
+            np.save(path(f"{name}.tmp.npy"), array)
+            os.replace(path(f"{name}.tmp.npy"), path(f"{name}.npy"))
+        with open(path(self.FILE_NAME + ".tmp"), "w", encoding="utf-8") as file:
+            json.dump({"k1": self.k1, "b": self.b, "average_length": self.average_length}, file)
+        os.replace(path(self.FILE_NAME + ".tmp"), path(self.FILE_NAME))
+
+    @classmethod
+    def exists(cls, directory):
+        """
+        True if the store has a complete saved index. Indexes saved without metadata
+        columns don't count, so ingest.py saves them again.
+        """
+        return os.path.exists(os.path.join(directory, cls.FILE_NAME)) and MetadataColumns.exists(
+            os.path.join(directory, cls.COLUMNS_PREFIX)
+        )
+
+    @classmethod
+    def load(cls, directory):
+        """Open the index saved in a store directory, memory-mapped (see MappedBM25Index)."""
+        return MappedBM25Index(directory)
+
+    @classmethod
+    def from_collection(cls, collection):
+        """Build the index from everything stored in a Chroma collection."""
+        stored = collection.get(include=["documents", "metadatas"])
+        return cls(stored["ids"], stored["documents"], stored["metadatas"])
+
+
+class MappedBM25Index(BM25Index):
+    """
+    BM25Index opened from the files written by `BM25Index.save`.
+
+    Nothing is rebuilt on load: the postings, lengths, terms, texts and metadata
+    columns are mapped read-only as saved. Terms are looked up by binary search over
+    the sorted term table, and a query is scored with NumPy into one array over all
+    documents, of which only the rows the filter keeps (found through the metadata
+    columns) are ranked. No metadata is decoded except for the results.
+    """
+
+    def __init__(self, directory):
+        path = partial(os.path.join, directory)
+        with open(path(self.FILE_NAME), "r", encoding="utf-8") as file:
+            params = json.load(file)
+        self.k1 = params["k1"]
+        self.b = params["b"]
+        self.average_length = params["average_length"]
+        self.terms = MappedStrings(path("bm25_terms"))
+        self.documents = MappedStrings(path("bm25_documents"))
+        self.metadatas = MappedJsonRecords(path("bm25_metadatas"))
+        self.metadata_columns = MetadataColumns.load(path(self.COLUMNS_PREFIX))
+        self.term_offsets = np.load(path("bm25_term_offsets.npy"), mmap_mode="r")
+        self.postings = np.load(path("bm25_postings.npy"), mmap_mode="r")
+        self.lengths = np.load(path("bm25_lengths.npy"), mmap_mode="r")
+
+    def _term_postings(self, term):
+        position = bisect_left(self.terms, term)
+        if position == len(self.terms) or self.terms[position] != term:
+            return self.postings[:0]
+        return self.postings[self.term_offsets[position]:self.term_offsets[position + 1]]
+
+    def _idf(self, term):
+        return self._idf_for(len(self._term_postings(term)))
+
+    def _idf_for(self, document_frequency):
+        return math.log(1 + (len(self.documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _scores(self, query):
+        """BM25 score of every document as an array, 0 for those sharing no term with the query."""
+        scores = np.zeros(len(self.lengths))
+        for term in set(tokenize(query)):
+            postings = self._term_postings(term)
+            if not len(postings):
+                continue
+            idf = self._idf_for(len(postings))
+            indices, frequencies = postings[:, 0], postings[:, 1].astype(np.float64)
+            norms = self.k1 * (1 - self.b + self.b * self.lengths[indices] / self.average_length)
+            # A term lists each document once, so the fancy-indexed add doesn't lose updates
+            scores[indices] += idf * frequencies * (self.k1 + 1) / (frequencies + norms)
+        return scores
+
+    def _ranked(self, query, k, filter):
+        scores = self._scores(query)
+        rows = self.metadata_columns.rows(filter)
+        candidates = np.flatnonzero(scores) if rows is None else rows[scores[rows] > 0]
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        best = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(index), float(scores[index])) for index in best]
+
+
+def reciprocal_rank_fusion(ranked_lists, k, rrf_k=60):
+    """
+    Merge several ranked document lists with reciprocal rank fusion: each document scores
+    sum(1 / (rrf_k + rank)) over the lists it appears in. Documents are matched by chunk id.
+    """
+    scores, documents = {}, {}
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked, start=1):
+            key = chunk_id(doc)
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[key] for key in best]
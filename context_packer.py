@@ -0,0 +1,66 @@
+from langchain_core.documents import Document
+
+# Rough token estimate for English text; avoids a count_tokens round trip per query
+CHARS_PER_TOKEN = 4
+# Shortest repeated run treated as splitter overlap rather than a coincidence
+MIN_OVERLAP_CHARS = 20
+# Overlap is only looked for near chunk edges (ingest.py uses a 100-char overlap)
+MAX_OVERLAP_CHARS = 300
+# A chunk cut to fit the budget is only kept if at least this many tokens remain
+MIN_TRUNCATED_TOKENS = 32
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _overlap(head, tail):
+    """Length of the longest suffix of `head` that is also a prefix of `tail`."""
+    limit = min(len(head), len(tail), MAX_OVERLAP_CHARS)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if head.endswith(tail[:size]):
+            return size
+    return 0
+
+
+def remove_overlap(text, kept_texts):
+    """
+    Strip the text `text` shares with already kept chunks: the splitter overlap at either
+    edge is cut, and a chunk fully contained in a kept chunk comes back empty.
+    """
+    for kept in kept_texts:
+        if text in kept:
+            return ""
+        text = text[_overlap(kept, text):]
+        overlap = _overlap(text, kept)
+        if overlap:
+            text = text[:-overlap]
+    return text.strip()
+
+
+def pack_context(docs, max_tokens):
+    """
+    Fit retrieved documents into a context budget of `max_tokens` estimated tokens.
+
+    Documents are taken in rank order, repeated text from overlapping chunks is removed,
+    and the first document that does not fit is truncated (or dropped when too little of
+    it would remain). Returns new Documents, so the retrieved ones are left untouched.
+    """
+    packed, kept_texts = [], []
+    remaining = max_tokens
+    for doc in docs:
+        text = remove_overlap(doc.page_content, kept_texts)
+        if not text:
+            continue
+        tokens = estimate_tokens(text)
+        if tokens > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                break
+            text = text[:remaining * CHARS_PER_TOKEN]
+            tokens = remaining
+        packed.append(Document(page_content=text, metadata=dict(doc.metadata)))
+        kept_texts.append(doc.page_content)
+        remaining -= tokens
+        if remaining <= 0:
+            break
+    return packed
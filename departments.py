@@ -0,0 +1,58 @@
+import os
+from dataclasses import dataclass
+
+from prompts import SYSTEM_PROMPT
+
+
+@dataclass(frozen=True)
+class DepartmentConfig:
+    """
+    Per-department settings for the multi-department server.
+
+    `k` is the number of chunks retrieved, `max_distance` drops vector results farther
+    than this distance (None keeps all of them), and `max_context_tokens` bounds the
+    estimated size of the context sent to Gemini. `backend` is "chroma" or "flat" (the
+    exported NumPy index, see flat_index.py), defaulting to VECTOR_BACKEND.
+    """
+    name: str
+    store_path: str
+    k: int = 3
+    max_distance: float | None = None
+    max_context_tokens: int = 1500
+    backend: str = "chroma"
+    system_prompt: str = SYSTEM_PROMPT
+
+
+# "chroma" or "flat" (flat_index.FlatIndex) for every department; <DEPARTMENT>_BACKEND overrides it
+DEFAULT_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+
+def _env_value(name, key, default, kind):
+    """Read a `<DEPARTMENT>_<KEY>` override, e.g. FINANCE_K=8 or HR_BACKEND=flat."""
+    value = os.getenv(f"{name.upper()}_{key}")
+    return default if value in (None, "") else kind(value)
+
+
+def department_config(name, k, max_context_tokens):
+    return DepartmentConfig(
+        name,
+        f"{name}_vector_store",
+        k=_env_value(name, "K", k, int),
+        max_distance=_env_value(name, "MAX_DISTANCE", None, float),
+        max_context_tokens=_env_value(name, "MAX_CONTEXT_TOKENS", max_context_tokens, int),
+        backend=_env_value(name, "BACKEND", DEFAULT_BACKEND, str).lower(),
+    )
+
+
+# Retrieval depth carried over from the former per-department servers.
+# HR chunks are one employee record each, so a smaller budget is enough.
+DEPARTMENTS = {
+    config.name: config
+    for config in [
+        department_config("finance", k=5, max_context_tokens=1500),
+        department_config("marketing", k=5, max_context_tokens=1500),
+        department_config("hr", k=3, max_context_tokens=600),
+        department_config("engineering", k=3, max_context_tokens=1200),
+        department_config("general", k=5, max_context_tokens=1500),
+    ]
+}
@@ -0,0 +1,248 @@
+import asyncio
+import os
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import partial
+
+from langchain_core.embeddings import Embeddings
+
+# Part of every key, bumped when the vectors a model returns change (2: Ollama /api/embed, unit length)
+KEY_VERSION = 2
+
+
+def normalize_query(text):
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivially different questions share a key."""
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return text.rstrip("?!. ")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LRU/TTL cache in front of an embedding model for query embeddings.
+
+    Keys are the model name plus the normalized query text. Entries live in memory
+    (bounded by `max_entries`) and, when `disk_path` is set, in a SQLite file so the
+    cache survives restarts. Document embeddings (ingestion) are passed straight through.
+    In the async path the SQLite reads and writes run in a worker thread, under their
+    own lock, so they never block the event loop or callers that hit the memory cache.
+
+    `embeddings` may instead be a zero-argument factory (anything that is not an
+    Embeddings instance), called on first use so the model client and its imports
+    stay off the startup path.
+    """
+
+    def __init__(self, embeddings, model_name, max_entries=2048, ttl_seconds=86400,
+                 disk_path=None, max_disk_entries=100_000):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (created_at, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        # The disk store is trimmed back to max_disk_entries after this many inserts, not on every one
+        self._prune_every = max(1, max_disk_entries // 100)
+        self._inserts_since_prune = 0
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(key TEXT PRIMARY KEY, created_at REAL, vector BLOB)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS query_embeddings_created_at ON query_embeddings (created_at)"
+            )
+            self._db.commit()
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            with self._factory_lock:
+                if self._embeddings is None:
+                    self._embeddings = self._factory()
+        return self._embeddings
+
+    @embeddings.setter
+    def embeddings(self, embeddings):
+        self._factory_lock = threading.Lock()
+        if isinstance(embeddings, Embeddings):
+            self._embeddings, self._factory = embeddings, None
+        else:
+            self._embeddings, self._factory = None, embeddings
+
+    def _key(self, text):
+        return hashlib.sha256(
+            f"{KEY_VERSION}\0{self.model_name}\0{normalize_query(text)}".encode("utf-8")
+        ).hexdigest()
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _memory_lookup(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def _disk_lookup(self, key):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, vector FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        with self._lock:
+            if row is not None and not self._expired(row[0]):
+                vector = array("d", row[1]).tolist()
+                self._remember(key, row[0], vector)
+                self.disk_hits += 1
+                return vector
+            self.misses += 1
+            return None
+
+    def _remember(self, key, created_at, vector):
+        self._memory[key] = (created_at, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, key, vector):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, vector)
+        return created_at
+
+    def _disk_store(self, rows):
+        """Write `(key, created_at, vector)` rows in one transaction."""
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)",
+                [(key, created_at, array("d", vector).tobytes()) for key, created_at, vector in rows]
+            )
+            self._inserts_since_prune += len(rows)
+            if self._inserts_since_prune >= self._prune_every:
+                # Keep the on-disk store bounded by dropping the oldest entries (an index range scan)
+                self._db.execute(
+                    "DELETE FROM query_embeddings WHERE created_at < ("
+                    "SELECT created_at FROM query_embeddings ORDER BY created_at DESC LIMIT 1 OFFSET ?)",
+                    (self.max_disk_entries - 1,)
+                )
+                self._inserts_since_prune = 0
+            self._db.commit()
+
+    def embed_query(self, text):
+        key = self._key(text)
+        vector = self._memory_lookup(key)
+        if vector is None and self._db is not None:
+            vector = self._disk_lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            created_at = self._store(key, vector)
+            if self._db is not None:
+                self._disk_store([(key, created_at, vector)])
+        return vector
+
+    async def aembed_query(self, text):
+        key = self._key(text)
+        vector = self._memory_lookup(key)
+        if vector is None and self._db is not None:
+            vector = await asyncio.to_thread(self._disk_lookup, key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            created_at = self._store(key, vector)
+            if self._db is not None:
+                await asyncio.to_thread(self._disk_store, [(key, created_at, vector)])
+        return vector
+
+    async def aembed_queries(self, texts):
+        """
+        Embed several queries, sending every cache miss to the model in one call when it
+        supports it (OllamaBatchEmbeddings.aembed_queries: a single /api/embed request).
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = [self._memory_lookup(key) for key in keys]
+        if self._db is not None:
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            found = await asyncio.to_thread(lambda: [self._disk_lookup(keys[i]) for i in missing])
+            for i, vector in zip(missing, found):
+                vectors[i] = vector
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            model = self.embeddings
+            missing_texts = [texts[i] for i in missing]
+            if hasattr(model, "aembed_queries"):
+                embedded = await model.aembed_queries(missing_texts)
+            else:
+                embedded = await asyncio.gather(*(model.aembed_query(text) for text in missing_texts))
+            rows = []
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                rows.append((keys[i], self._store(keys[i], vector), vector))
+            if self._db is not None:
+                await asyncio.to_thread(self._disk_store, rows)
+        return vectors
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts):
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self):
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+        }
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _ollama_embeddings(model):
+    from ollama_embeddings import OllamaBatchEmbeddings
+
+    return OllamaBatchEmbeddings(model=model, base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+
+
+def get_cached_embeddings(model="nomic-embed-text"):
+    """
+    Return the process-wide cached embedder for `model`, shared by every department.
+    Limits come from EMBED_CACHE_SIZE, EMBED_CACHE_TTL (seconds) and, to persist the
+    cache across restarts, EMBED_CACHE_PATH. OLLAMA_BASE_URL points at the Ollama server.
+    """
+    with _shared_lock:
+        if model not in _shared:
+            _shared[model] = CachedEmbeddings(
+                partial(_ollama_embeddings, model),
+                model_name=model,
+                max_entries=int(os.getenv("EMBED_CACHE_SIZE", 2048)),
+                ttl_seconds=float(os.getenv("EMBED_CACHE_TTL", 86400)),
+                disk_path=os.getenv("EMBED_CACHE_PATH") or None,
+            )
+        return _shared[model]
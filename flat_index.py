@@ -0,0 +1,151 @@
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+import mapped_records
+from mapped_records import MappedJsonRecords, MappedStrings
+from metadata_filters import MetadataColumns
+
+
+class FlatIndex:
+    """
+    Exact nearest-neighbour search over one department's chunks with NumPy.
+
+    The department stores hold a few hundred to a few thousand chunks, where going
+    through Chroma's SQLite and HNSW layers costs more than scoring every chunk.
+    ingest.py exports each store next to its Chroma files as a contiguous float32
+    matrix of the embeddings as stored (`flat_vectors.npy`), their squared norms
+    (`flat_norms.npy`) and parallel ids, texts and metadata in the offsets + UTF-8 blob
+    layout of mapped_records.py (`flat_ids.*`, `flat_documents.*`, `flat_metadatas.*`),
+    and the metadata as MetadataColumns (`flat_metadata_columns*`), which picks the rows
+    a filter keeps. A query is one matrix-vector product plus `argpartition` for the top k.
+
+    Distances are squared Euclidean distances on the raw vectors (|x|^2 - 2 x.q + |q|^2,
+    lower is closer), exactly Chroma's default "l2" distance, so max_distance thresholds
+    and the C-Level fan-out merge compare alike across backends.
+    The search methods mirror the parts of the langchain Chroma API the backend uses,
+    so the registry can serve either.
+    """
+
+    VECTORS_FILE = "flat_vectors.npy"
+    NORMS_FILE = "flat_norms.npy"
+    RECORDS_PREFIXES = ("flat_ids", "flat_documents", "flat_metadatas")
+    COLUMNS_PREFIX = "flat_metadata_columns"
+
+    def __init__(self, vectors, norms, ids, documents, metadatas, metadata_columns):
+        self.vectors = vectors
+        self.norms = norms
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.metadata_columns = metadata_columns
+
+    @staticmethod
+    def exists(directory):
+        """
+        True if the store has a complete export. Older exports (`flat_records.json`,
+        normalized vectors without `flat_norms.npy`, or no metadata columns) don't count,
+        so ingest.py redoes them.
+        """
+        return MetadataColumns.exists(os.path.join(directory, FlatIndex.COLUMNS_PREFIX)) and all(
+            os.path.exists(os.path.join(directory, name)) for name in (FlatIndex.VECTORS_FILE, FlatIndex.NORMS_FILE)
+        ) and all(
+            mapped_records.exists(os.path.join(directory, prefix)) for prefix in FlatIndex.RECORDS_PREFIXES
+        )
+
+    @classmethod
+    def export(cls, collection, directory):
+        """Write the flat index files for everything stored in a Chroma collection."""
+        stored = collection.get(include=["embeddings", "documents", "metadatas"])
+        vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+        norms = np.einsum("ij,ij->i", vectors, vectors) if vectors.size else np.zeros(len(vectors), np.float32)
+        # Written under temporary names and renamed, so a running backend never maps a partial file
+        vectors_path = os.path.join(directory, cls.VECTORS_FILE)
+        ids_prefix, documents_prefix, metadatas_prefix = (
+            os.path.join(directory, prefix) for prefix in cls.RECORDS_PREFIXES
+        )
+        mapped_records.write_strings(ids_prefix, stored["ids"])
+        mapped_records.write_strings(documents_prefix, stored["documents"])
+        metadatas = [metadata or {} for metadata in stored["metadatas"]]
+        mapped_records.write_json_records(metadatas_prefix, metadatas)
+        MetadataColumns.build(metadatas).save(os.path.join(directory, cls.COLUMNS_PREFIX))
+        norms_path = os.path.join(directory, cls.NORMS_FILE)
+        np.save(norms_path + ".tmp.npy", norms)
+        os.replace(norms_path + ".tmp.npy", norms_path)
+        # The vectors go last: a reader that sees the new matrix also sees the new records
+        np.save(vectors_path + ".tmp.npy", vectors)
+        os.replace(vectors_path + ".tmp.npy", vectors_path)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open an exported index. The vectors are memory-mapped read-only unless `mmap` is False."""
+        mmap_mode = "r" if mmap else None
+        vectors = np.load(os.path.join(directory, cls.VECTORS_FILE), mmap_mode=mmap_mode)
+        norms = np.load(os.path.join(directory, cls.NORMS_FILE), mmap_mode=mmap_mode)
+        ids_prefix, documents_prefix, metadatas_prefix = (
+            os.path.join(directory, prefix) for prefix in cls.RECORDS_PREFIXES
+        )
+        return cls(
+            vectors,
+            norms,
+            MappedStrings(ids_prefix),
+            MappedStrings(documents_prefix),
+            MappedJsonRecords(metadatas_prefix),
+            MetadataColumns.load(os.path.join(directory, cls.COLUMNS_PREFIX)),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _rows(self, where):
+        """Indices of the rows matching a metadata filter (None means every row)."""
+        return self.metadata_columns.rows(where)
+
+    def _distances(self, rows, query_vectors):
+        """Squared L2 distances from one query (or each row of a query matrix) to the rows kept."""
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        norms = self.norms if rows is None else self.norms[rows]
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        query_norms = np.sum(query_vectors * query_vectors, axis=-1, keepdims=True)
+        # Rounding can take a distance slightly below zero for a chunk identical to the query
+        return np.maximum(norms - 2 * (query_vectors @ vectors.T) + query_norms, 0)
+
+    @staticmethod
+    def _top_k(distances, k):
+        if k >= len(distances):
+            return np.argsort(distances)
+        best = np.argpartition(distances, k - 1)[:k]
+        return best[np.argsort(distances[best])]
+
+    def _results(self, rows, distances, k):
+        top = self._top_k(distances, k)
+        indices = top if rows is None else rows[top]
+        return [
+            # No id on the Document, like Chroma's results, so fusion matches chunks by content
+            (Document(page_content=self.documents[i], metadata=dict(self.metadatas[i])), float(distances[j]))
+            for i, j in zip(indices, top)
+        ]
+
+    def search(self, query_vector, k, filter=None):
+        """Return up to k `(Document, distance)` pairs, closest first."""
+        rows = self._rows(filter)
+        if len(self) == 0 or (rows is not None and len(rows) == 0):
+            return []
+        return self._results(rows, self._distances(rows, query_vector), k)
+
+    def search_batch(self, query_vectors, k, filter=None):
+        """Search several queries sharing one filter with a single matrix-matrix product."""
+        rows = self._rows(filter)
+        if len(self) == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in query_vectors]
+        distances = self._distances(rows, query_vectors)
+        return [self._results(rows, row_distances, k) for row_distances in distances]
+
+    # langchain Chroma compatible surface used by query_pipeline
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None):
+        return [doc for doc, _ in self.search(embedding, k, filter)]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4, filter=None):
+        return self.search(embedding, k, filter)
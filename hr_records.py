@@ -0,0 +1,86 @@
+import pandas as pd
+
+from metadata_filters import METADATA_DATE_COLUMNS, METADATA_FIELDS
+
+DATE_FORMAT = "%B %d, %Y"
+DATE_COLUMNS = ["date_of_joining", "date_of_birth", "last_review_date"]
+
+
+def build_hr_summaries(df):
+    """
+    Turn HR rows into one descriptive sentence per employee.
+
+    Works column by column instead of row by row: each date column is parsed and
+    formatted once, the salary column is formatted in one pass, and the sentence is
+    assembled by concatenating whole string columns. Produces the same text as the
+    old per-row `df.apply` builder, including "nan" for a missing cell (a missing date,
+    which the old builder could not format, is also written as "nan").
+    """
+    # pandas keeps NaN through astype(str) and strftime, and one NaN would make the whole sentence NaN
+    dates = {
+        column: pd.to_datetime(df[column]).dt.strftime(DATE_FORMAT).fillna("nan") for column in DATE_COLUMNS
+    }
+    salary = df["salary"].map("{:,.2f}".format)
+
+    def text(column):
+        return df[column].astype(str).fillna("nan")
+
+    return (
+        text("full_name") + " (Employee ID: " + text("employee_id") + ") is a " + text("role")
+        + " in the " + text("department") + " department, location: " + text("location")
+        + ". They joined FinTechCo on " + dates["date_of_joining"]
+        + " and were born on " + dates["date_of_birth"] + ". Their email is " + text("email")
+        + ", and their manager is identified by Employee ID " + text("manager_id")
+        + ". They earn an annual salary of ₹" + salary + ". "
+        + "As of the last performance review on " + dates["last_review_date"]
+        + ", they hold a performance rating of " + text("performance_rating")
+        + ". Their attendance rate stands at " + text("attendance_pct")
+        + "%, with " + text("leaves_taken") + " leaves taken and " + text("leave_balance")
+        + " days of leave remaining."
+    )
+
+
+def iter_hr_frames(path, chunk_rows=None):
+    """
+    Read the HR CSV in frames of `chunk_rows` rows (or all at once when None) so very
+    large HR exports never have to be parsed into memory in one piece.
+    """
+    if chunk_rows is None:
+        yield pd.read_csv(path)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def iter_hr_summaries(path, chunk_rows=None):
+    """Yield the employee summary sentences of an HR CSV, one frame at a time."""
+    for frame in iter_hr_frames(path, chunk_rows):
+        yield from build_hr_summaries(frame).tolist()
+
+
+def build_hr_metadata(df):
+    """
+    Typed metadata for each employee row, as a list of dicts Chroma can store and filter on.
+    Missing values are left out, since Chroma metadata cannot hold nulls.
+    """
+    columns = {}
+    for column, kind in METADATA_FIELDS.items():
+        values = df[column]
+        columns[column] = [None if pd.isna(value) else kind(value) for value in values]
+    for column in METADATA_DATE_COLUMNS:
+        parsed = pd.to_datetime(df[column])
+        columns[column] = [None if pd.isna(value) else value for value in parsed.dt.strftime("%Y-%m-%d")]
+        columns[f"{column}_ts"] = [
+            None if pd.isna(value) else int(value.timestamp()) for value in parsed
+        ]
+
+    names = list(columns)
+    return [
+        {name: value for name, value in zip(names, row) if value is not None}
+        for row in zip(*columns.values())
+    ]
+
+
+def iter_hr_records(path, chunk_rows=None):
+    """Yield `(summary, metadata)` for each employee in an HR CSV, one frame at a time."""
+    for frame in iter_hr_frames(path, chunk_rows):
+        yield from zip(build_hr_summaries(frame).tolist(), build_hr_metadata(frame))
@@ -0,0 +1,270 @@
+"""
+Build the department vector stores from a manifest of source files.
+
+    python ingest.py --data-dir data
+    python ingest.py --data-dir data --departments finance hr --workers 2
+    python ingest.py --data-dir data --rebuild
+
+The manifest (ingest_manifest.json by default) maps each department to its source
+files, relative to --data-dir. Markdown files are split into overlapping chunks and
+the HR CSV becomes one chunk per employee with the employee's fields as metadata.
+Every department is written to `<store-dir>/<department>_vector_store`, which is
+where the backend looks for it.
+
+Chunk ids are content hashes, so re-running only embeds chunks that are new since the
+last run and deletes chunks whose text is gone; pass --rebuild to start over. A BM25
+index of the department's chunks is saved alongside (bm25_*) for hybrid retrieval, as
+is a flat NumPy export of the embeddings and chunks (flat_*) for departments served
+with the "flat" backend. Departments are built in parallel in a process pool and the
+chunking and embedding throughput of each one is reported at the end. Within a
+department, new chunks are embedded in batches with --embed-concurrency requests in
+flight, so the total load on the embedding server is up to workers x embed-concurrency
+requests.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from batch_embedder import BatchingEmbedder
+from bm25_index import BM25Index
+from flat_index import FlatIndex
+from ollama_embeddings import OllamaBatchEmbeddings
+from vectorstore_registry import STORE_MARKER, mark_store_updated
+
+DEFAULT_MODEL = "nomic-embed-text"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHUNK_OVERLAP = 100
+COLLECTION_NAME = "langchain" # Default collection used by langchain's Chroma wrapper
+DELETE_BATCH_SIZE = 1000
+HR_CSV_CHUNK_ROWS = 50_000 # HR exports are parsed in frames of this many rows
+
+
+def read_text(path):
+    with open(path, "rb") as file:
+        byte_data = file.read()
+    try:
+        return byte_data.decode("utf-8")
+    except UnicodeDecodeError:
+        return byte_data.decode("latin1")
+
+
+def load_markdown(path, text_splitter):
+    """Split a markdown document into overlapping chunks."""
+    chunks = text_splitter.split_text(read_text(path))
+    # Add metadata for source tracking
+    return chunks, [{"source": path.stem} for _ in chunks]
+
+
+def load_hr_csv(path, text_splitter):
+    """
+    One chunk per employee, never split or merged, carrying the employee's fields as
+    typed metadata so queries can pre-filter on them.
+    """
+    from hr_records import iter_hr_records
+
+    chunks, metadatas = [], []
+    for summary, metadata in iter_hr_records(path, chunk_rows=HR_CSV_CHUNK_ROWS):
+        chunks.append(summary)
+        metadatas.append({"source": path.stem, **metadata})
+    return chunks, metadatas
+
+
+LOADERS = {
+    ".md": load_markdown,
+    ".csv": load_hr_csv,
+}
+
+
+def chunk_department(files, data_dir, chunk_size, chunk_overlap):
+    """Load and split every source file of a department. Returns (chunks, metadatas)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+    chunks, metadatas = [], []
+    for relative_path in files:
+        path = Path(data_dir) / relative_path
+        loader = LOADERS.get(path.suffix.lower())
+        if loader is None:
+            raise ValueError(f"No loader for {path} (supported: {', '.join(LOADERS)})")
+        file_chunks, file_metadatas = loader(path, text_splitter)
+        chunks.extend(file_chunks)
+        metadatas.extend(file_metadatas)
+    return chunks, metadatas
+
+
+def chunk_ids(chunks, metadatas):
+    """
+    Deterministic ids from a hash of each chunk's source and text, so an unchanged chunk
+    keeps its id across runs. Repeats of the same text in a source get a counter suffix.
+    """
+    ids, seen = [], {}
+    for chunk, metadata in zip(chunks, metadatas):
+        digest = hashlib.sha256(f"{metadata['source']}\0{chunk}".encode("utf-8")).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
+
+
+def build_department(department, spec, data_dir, store_dir, ollama_url, rebuild=False, embed_options=None):
+    """
+    Bring one department's vector store up to date and return its throughput stats.
+    Only chunks whose id is not in the store yet are embedded and inserted, and chunks
+    that no longer exist in the sources are deleted. `rebuild` starts from an empty store.
+    `embed_options` are passed to BatchingEmbedder (batch_size, max_workers, max_retries).
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    import chromadb
+
+    start = time.perf_counter()
+    chunks, metadatas = chunk_department(
+        spec["files"], data_dir,
+        spec.get("chunk_size", DEFAULT_CHUNK_SIZE),
+        spec.get("chunk_overlap", DEFAULT_CHUNK_OVERLAP)
+    )
+    ids = chunk_ids(chunks, metadatas)
+    chunk_seconds = time.perf_counter() - start
+
+    persist_directory = os.path.join(store_dir, f"{department}_vector_store")
+    if rebuild:
+        shutil.rmtree(persist_directory, ignore_errors=True)
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_or_create_collection(COLLECTION_NAME, embedding_function=None)
+
+    # Diff against what is already stored
+    existing_ids = set(collection.get(include=[])["ids"])
+    new_rows = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing_ids]
+    removed_ids = sorted(existing_ids - set(ids))
+
+    for i in range(0, len(removed_ids), DELETE_BATCH_SIZE):
+        collection.delete(ids=removed_ids[i:i + DELETE_BATCH_SIZE])
+
+    # Embed new chunks in concurrent batches and write each batch as soon as it is ready
+    embedder = BatchingEmbedder(
+        OllamaBatchEmbeddings(model=spec.get("model", DEFAULT_MODEL), base_url=ollama_url),
+        **(embed_options or {})
+    )
+    write_seconds = 0.0
+    start = time.perf_counter()
+    for offset, vectors in embedder.embed_batches([chunks[i] for i in new_rows]):
+        rows = new_rows[offset:offset + len(vectors)]
+        write_start = time.perf_counter()
+        collection.add(
+            ids=[ids[row] for row in rows],
+            documents=[chunks[row] for row in rows],
+            metadatas=[metadatas[row] for row in rows],
+            embeddings=vectors
+        )
+        write_seconds += time.perf_counter() - write_start
+    embed_seconds = time.perf_counter() - start
+
+    # Rebuild the lexical (BM25) index next to the Chroma files whenever the store changed
+    bm25_seconds = 0.0
+    if new_rows or removed_ids or not BM25Index.exists(persist_directory):
+        start = time.perf_counter()
+        BM25Index.from_collection(collection).save(persist_directory)
+        bm25_seconds = time.perf_counter() - start
+
+    # Same for the flat NumPy export used by departments served with the "flat" backend
+    flat_seconds = 0.0
+    if new_rows or removed_ids or not FlatIndex.exists(persist_directory):
+        start = time.perf_counter()
+        FlatIndex.export(collection, persist_directory)
+        flat_seconds = time.perf_counter() - start
+
+    # Last, once everything is written: tells running backends to reopen the store
+    if bm25_seconds or flat_seconds or not os.path.exists(os.path.join(persist_directory, STORE_MARKER)):
+        mark_store_updated(persist_directory, len(chunks))
+
+    return {
+        "department": department,
+        "chunks": len(chunks),
+        "added": len(new_rows),
+        "embed_retries": embedder.retries,
+        "deleted": len(removed_ids),
+        "unchanged": len(chunks) - len(new_rows),
+        "chunk_seconds": chunk_seconds,
+        "embed_seconds": embed_seconds,
+        "write_seconds": write_seconds,
+        "bm25_seconds": bm25_seconds,
+        "flat_seconds": flat_seconds,
+        "chunks_per_sec": len(chunks) / chunk_seconds if chunk_seconds else 0.0,
+        "embeddings_per_sec": len(new_rows) / embed_seconds if embed_seconds else 0.0,
+    }
+
+
+def print_report(results):
+    print(
+        f"{'department':<12}{'chunks':>8}{'added':>8}{'deleted':>9}{'unchanged':>11}"
+        f"{'chunks/sec':>14}{'embeddings/sec':>16}{'write (s)':>11}{'bm25 (s)':>10}{'flat (s)':>10}"
+    )
+    for stats in results:
+        print(
+            f"{stats['department']:<12}{stats['chunks']:>8}{stats['added']:>8}{stats['deleted']:>9}"
+            f"{stats['unchanged']:>11}{stats['chunks_per_sec']:>14.1f}"
+            f"{stats['embeddings_per_sec']:>16.1f}{stats['write_seconds']:>11.2f}{stats['bm25_seconds']:>10.2f}"
+            f"{stats['flat_seconds']:>10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default="ingest_manifest.json")
+    parser.add_argument("--data-dir", default="data", help="directory the manifest paths are relative to")
+    parser.add_argument("--store-dir", default=".", help="where the *_vector_store directories are written")
+    parser.add_argument("--departments", nargs="*", help="only build these departments")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="departments built in parallel")
+    parser.add_argument("--ollama-url", default=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+    parser.add_argument("--rebuild", action="store_true", help="re-embed everything instead of updating in place")
+    parser.add_argument("--embed-batch-size", type=int, default=32, help="chunks per embedding batch")
+    parser.add_argument("--embed-concurrency", type=int, default=4,
+                        help="embedding batches in flight per department")
+    parser.add_argument("--embed-retries", type=int, default=3, help="retries per failed embedding batch")
+    args = parser.parse_args()
+
+    with open(args.manifest, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    departments = args.departments or list(manifest)
+    unknown = set(departments) - set(manifest)
+    if unknown:
+        parser.error(f"Departments not in {args.manifest}: {', '.join(sorted(unknown))}")
+
+    embed_options = {
+        "batch_size": args.embed_batch_size,
+        "max_workers": args.embed_concurrency,
+        "max_retries": args.embed_retries,
+    }
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(departments))) as pool:
+        futures = {
+            pool.submit(build_department, department, manifest[department],
+                        args.data_dir, args.store_dir, args.ollama_url, args.rebuild, embed_options): department
+            for department in departments
+        }
+        for future in as_completed(futures):
+            stats = future.result()
+            print(
+                f"Stored {stats['chunks']} {stats['department']} chunks "
+                f"({stats['added']} added, {stats['deleted']} deleted)."
+            )
+            results.append(stats)
+
+    print()
+    print_report(sorted(results, key=lambda stats: stats["department"]))
+    print(f"\nBuilt {len(results)} vector stores in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
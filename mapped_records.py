@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+
+
+def write_strings(prefix, strings):
+    """
+    Write strings as one UTF-8 blob (`<prefix>.bin`) plus an int64 offsets array
+    (`<prefix>.idx.npy`, n + 1 entries), the layout MappedStrings maps read-only.
+    Files are written under temporary names and renamed into place.
+    """
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    with open(f"{prefix}.bin.tmp", "wb") as file:
+        for i, text in enumerate(strings):
+            data = text.encode("utf-8")
+            file.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    np.save(f"{prefix}.idx.tmp.npy", offsets)
+    os.replace(f"{prefix}.bin.tmp", f"{prefix}.bin")
+    os.replace(f"{prefix}.idx.tmp.npy", f"{prefix}.idx.npy")
+
+
+def write_json_records(prefix, records):
+    write_strings(prefix, [json.dumps(record) for record in records])
+
+
+def exists(prefix):
+    return os.path.exists(f"{prefix}.idx.npy")
+
+
+class MappedStrings:
+    """
+    Read-only sequence of strings backed by memory-mapped files.
+
+    Nothing is parsed when it is opened, and a string is only decoded when it is
+    accessed. Every process serving a store maps the same pages from the OS page cache,
+    so uvicorn workers share one copy of a department's flat and BM25 indexes (built on
+    these files and on NumPy arrays loaded with mmap_mode="r") instead of each holding
+    a private one, and a new worker opens them in milliseconds.
+    """
+
+    def __init__(self, prefix):
+        self.offsets = np.load(f"{prefix}.idx.npy", mmap_mode="r")
+        size = int(self.offsets[-1])
+        # np.memmap cannot map an empty file
+        self.data = np.memmap(f"{prefix}.bin", dtype=np.uint8, mode="r") if size else np.zeros(0, np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class MappedJsonRecords(MappedStrings):
+    """MappedStrings whose items are JSON objects, decoded on access."""
+
+    def __getitem__(self, index):
+        return json.loads(super().__getitem__(index))
@@ -0,0 +1,332 @@
+import json
+import os
+import re
+from bisect import bisect_left
+from functools import reduce
+
+import numpy as np
+
+import mapped_records
+from mapped_records import MappedStrings
+
+# Employee ids look like FINEMP1003, HREMP1042, ...
+EMPLOYEE_ID_PATTERN = re.compile(r"\b[A-Z]{2,}EMP\d+\b", re.IGNORECASE)
+
+# Employee fields stored as chunk metadata in the HR store, with their types.
+# Dates are stored both as ISO strings and as `<column>_ts` epoch seconds for range filters.
+METADATA_FIELDS = {
+    "employee_id": str,
+    "full_name": str,
+    "role": str,
+    "department": str,
+    "location": str,
+    "manager_id": str,
+    "performance_rating": int,
+    "attendance_pct": float,
+    "leaves_taken": int,
+    "leave_balance": int,
+}
+METADATA_DATE_COLUMNS = ["date_of_joining", "last_review_date"]
+
+# Every field a filter may name: the source file stem on every chunk, plus the HR fields
+FILTER_FIELDS = {
+    "source": str,
+    **METADATA_FIELDS,
+    **{column: str for column in METADATA_DATE_COLUMNS},
+    **{f"{column}_ts": int for column in METADATA_DATE_COLUMNS},
+}
+LIST_OPERATORS = ("$in", "$nin")
+# Chroma only compares numbers with these
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+OPERATORS = ("$eq", "$ne", *LIST_OPERATORS, *RANGE_OPERATORS)
+
+
+def employee_ids_in(text):
+    return sorted({match.upper() for match in EMPLOYEE_ID_PATTERN.findall(text)})
+
+
+def _check_value(field, kind, value):
+    # bool is an int subclass, but Chroma stores it as its own type
+    if kind is float or field.endswith("_ts"):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, kind) and not isinstance(value, bool)
+    if not ok:
+        got = "null" if value is None else type(value).__name__
+        raise ValueError(f"Filter on '{field}' expects {kind.__name__}, got {got}.")
+
+
+def validate_filters(filters):
+    """
+    Check user filters before they reach a store, raising ValueError with a message
+    the API returns as a 400. Each known field maps to a value, a non-empty list of
+    values, or an object of operators from OPERATORS; range operators need a numeric field.
+    """
+    if filters is None:
+        return
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be an object mapping metadata fields to values.")
+    for field, condition in filters.items():
+        kind = FILTER_FIELDS.get(field)
+        if kind is None:
+            raise ValueError(f"Unknown filter field '{field}'. Known fields are: {', '.join(FILTER_FIELDS)}.")
+        if isinstance(condition, dict):
+            if not condition:
+                raise ValueError(f"Filter on '{field}' has no operator.")
+            operators = condition.items()
+        elif isinstance(condition, list):
+            operators = [("$in", condition)]
+        else:
+            operators = [("$eq", condition)]
+        for operator, value in operators:
+            if operator not in OPERATORS:
+                raise ValueError(f"Unsupported operator '{operator}' on '{field}'. Supported: {', '.join(OPERATORS)}.")
+            if operator in RANGE_OPERATORS and kind is str and not field.endswith("_ts"):
+                raise ValueError(f"'{operator}' needs a numeric field, '{field}' is text.")
+            if operator in LIST_OPERATORS:
+                if not isinstance(value, list) or not value:
+                    raise ValueError(f"'{operator}' on '{field}' expects a non-empty list.")
+                for item in value:
+                    _check_value(field, kind, item)
+            else:
+                _check_value(field, kind, value)
+
+
+def build_filter(department, user_query, filters=None):
+    """
+    Build a Chroma `where` clause that is applied before the vector search.
+
+    `filters` maps metadata fields to an exact value, a list of accepted values, or an
+    object of operators such as {"$gte": 1672531200} (see validate_filters, which the
+    API runs first). For the HR store, employee ids mentioned in the query are turned into an exact
+    `employee_id` filter, so "leave balance of FINEMP1003" searches that one record
+    instead of hoping it ranks in the top k. Returns None when there is nothing to filter.
+    """
+    filters = dict(filters or {})
+    if department == "hr" and "employee_id" not in filters:
+        employee_ids = employee_ids_in(user_query)
+        if employee_ids:
+            filters["employee_id"] = employee_ids if len(employee_ids) > 1 else employee_ids[0]
+
+    conditions = []
+    for field, value in filters.items():
+        if isinstance(value, dict):
+            # Chroma takes one operator per field expression, so ranges become separate clauses
+            conditions.extend({field: {operator: operand}} for operator, operand in value.items())
+        else:
+            conditions.append({field: {"$in": value} if isinstance(value, list) else value})
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def matches(metadata, where):
+    """
+    Evaluate a Chroma metadata `where` clause the way Chroma does: `$and`/`$or` of
+    clauses, and per field a value or one of $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte.
+    Raises ValueError on anything else rather than silently matching every chunk.
+    """
+    if where is None:
+        return True
+    if "$and" in where:
+        return all(matches(metadata, clause) for clause in where["$and"])
+    if "$or" in where:
+        return any(matches(metadata, clause) for clause in where["$or"])
+    for field, condition in where.items():
+        if field.startswith("$"):
+            raise ValueError(f"Unsupported logical operator in where clause: {field}")
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            unsupported = [operator for operator in condition if operator not in OPERATORS]
+            if unsupported:
+                raise ValueError(f"Unsupported operator in where clause: {unsupported[0]}")
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compare(value, operator, operand):
+    # As in Chroma, an operator only matches chunks that have the field
+    if value is None:
+        return False
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    # Ranges only compare numbers
+    if not _is_number(value):
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    return value <= operand
+
+
+def _key(field, value):
+    return f"{field}\0{json.dumps(value, sort_keys=True)}"
+
+
+class MetadataColumns:
+    """
+    Column-wise copy of a store's chunk metadata that answers a `where` clause with the
+    indices of the rows it matches, without decoding every row's metadata as `matches`
+    would. The BM25 and flat indexes use it to pick their candidate rows before scoring.
+
+    Every (field, value) pair has a sorted list of rows, found by binary search over the
+    sorted `field\0<json value>` keys, and every field holding numbers also has a float64
+    column (NaN where missing) for ranges and for numeric equality, so 95 matches 95.0
+    as in Chroma. Saved as `<prefix>_keys.*` (mapped_records layout),
+    `<prefix>_key_offsets.npy`, `<prefix>_rows.npy` and `<prefix>_numbers.npy`, with
+    `<prefix>.json` written last to mark a complete set.
+    """
+
+    def __init__(self, count, keys, key_offsets, key_rows, numeric_fields, numbers):
+        self.count = count
+        self.keys = keys
+        self.key_offsets = key_offsets
+        self.key_rows = key_rows
+        self.numeric_fields = {field: i for i, field in enumerate(numeric_fields)}
+        self.numbers = numbers
+
+    @classmethod
+    def build(cls, metadatas):
+        """Build the columns for a sequence of metadata dicts, row i being metadatas[i]."""
+        rows_by_key = {}  # key -> rows in increasing order
+        numbers = {}  # field -> {row: value}
+        for row, metadata in enumerate(metadatas):
+            for field, value in (metadata or {}).items():
+                rows_by_key.setdefault(_key(field, value), []).append(row)
+                if _is_number(value):
+                    numbers.setdefault(field, {})[row] = value
+        keys = sorted(rows_by_key)
+        key_offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        for i, key in enumerate(keys):
+            key_offsets[i + 1] = key_offsets[i] + len(rows_by_key[key])
+        key_rows = np.fromiter(
+            (row for key in keys for row in rows_by_key[key]), dtype=np.int32, count=int(key_offsets[-1])
+        )
+        numeric_fields = sorted(numbers)
+        columns = np.full((len(numeric_fields), len(metadatas)), np.nan)
+        for i, field in enumerate(numeric_fields):
+            columns[i, list(numbers[field])] = list(numbers[field].values())
+        return cls(len(metadatas), keys, key_offsets, key_rows, numeric_fields, columns)
+
+    def save(self, prefix):
+        mapped_records.write_strings(f"{prefix}_keys", self.keys)
+        for name, array in [("key_offsets", self.key_offsets), ("rows", self.key_rows), ("numbers", self.numbers)]:
+            np.save(f"{prefix}_{name}.tmp.npy", array)
+            os.replace(f"{prefix}_{name}.tmp.npy", f"{prefix}_{name}.npy")
+        with open(f"{prefix}.json.tmp", "w", encoding="utf-8") as file:
+            json.dump({"count": self.count, "numeric_fields": list(self.numeric_fields)}, file)
+        os.replace(f"{prefix}.json.tmp", f"{prefix}.json")
+
+    @staticmethod
+    def exists(prefix):
+        return os.path.exists(f"{prefix}.json")
+
+    @classmethod
+    def load(cls, prefix):
+        """Open saved columns, memory-mapped read-only."""
+        with open(f"{prefix}.json", "r", encoding="utf-8") as file:
+            params = json.load(file)
+        return cls(
+            params["count"],
+            MappedStrings(f"{prefix}_keys"),
+            np.load(f"{prefix}_key_offsets.npy", mmap_mode="r"),
+            np.load(f"{prefix}_rows.npy", mmap_mode="r"),
+            params["numeric_fields"],
+            np.load(f"{prefix}_numbers.npy", mmap_mode="r"),
+        )
+
+    def rows(self, where):
+        """
+        Sorted indices of the rows matching a `where` clause, with the semantics of
+        `matches` (None means every row). Raises ValueError on unsupported operators.
+        """
+        if where is None:
+            return None
+        if "$and" in where:
+            clauses = [self.rows(clause) for clause in where["$and"]]
+            return reduce(self._intersect, clauses) if clauses else self._all()
+        if "$or" in where:
+            return self._union([self.rows(clause) for clause in where["$or"]])
+        found = None
+        for field, condition in where.items():
+            if field.startswith("$"):
+                raise ValueError(f"Unsupported logical operator in where clause: {field}")
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            unsupported = [operator for operator in condition if operator not in OPERATORS]
+            if unsupported:
+                raise ValueError(f"Unsupported operator in where clause: {unsupported[0]}")
+            for operator, operand in condition.items():
+                rows = self._compare(field, operator, operand)
+                found = rows if found is None else self._intersect(found, rows)
+        return self._all() if found is None else found
+
+    def _all(self):
+        return np.arange(self.count)
+
+    @staticmethod
+    def _intersect(left, right):
+        return np.intersect1d(left, right, assume_unique=True)
+
+    def _union(self, parts):
+        keep = np.zeros(self.count, dtype=bool)
+        for rows in parts:
+            keep[rows] = True
+        return np.flatnonzero(keep)
+
+    def _key_range(self, low, high):
+        start, end = bisect_left(self.keys, low), bisect_left(self.keys, high)
+        return self.key_rows[self.key_offsets[start]:self.key_offsets[end]]
+
+    def _equal(self, field, value):
+        if _is_number(value):
+            column = self.numeric_fields.get(field)
+            if column is None:
+                return np.zeros(0, dtype=np.int64)
+            return np.flatnonzero(self.numbers[column] == value)
+        key = _key(field, value)
+        return self._key_range(key, key + "\0")
+
+    def _compare(self, field, operator, operand):
+        if operator in ("$eq", "$ne"):
+            found = self._equal(field, operand)
+        elif operator in LIST_OPERATORS:
+            found = self._union([self._equal(field, value) for value in operand])
+        else:
+            column = self.numeric_fields.get(field)
+            if column is None:
+                return np.zeros(0, dtype=np.int64)
+            values = self.numbers[column]
+            with np.errstate(invalid="ignore"):
+                if operator == "$gt":
+                    return np.flatnonzero(values > operand)
+                if operator == "$gte":
+                    return np.flatnonzero(values >= operand)
+                if operator == "$lt":
+                    return np.flatnonzero(values < operand)
+                return np.flatnonzero(values <= operand)
+        if operator in ("$ne", "$nin"):
+            # Only rows that have the field, as in `_compare`
+            keep = np.zeros(self.count, dtype=bool)
+            keep[self._key_range(f"{field}\0", f"{field}\1")] = True
+            keep[found] = False
+            return np.flatnonzero(keep)
+        return found
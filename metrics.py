@@ -0,0 +1,94 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages of a query, in pipeline order
+STAGES = ["open_store", "embed", "search", "rerank", "cache_lookup", "prompt_build", "generate"]
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond searches to slow generations
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Minimal Prometheus-style histogram with labels, rendered in the text exposition format.
+    Kept dependency-free instead of pulling in prometheus_client for two metrics.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        with self._lock:
+            series = self._series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted(self._series.items())
+        for label_values, series in series_items:
+            labels = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, label_values))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines)
+
+
+stage_seconds = Histogram(
+    "rag_stage_duration_seconds", "Time spent in each query pipeline stage.", ("department", "stage")
+)
+request_seconds = Histogram(
+    "rag_request_duration_seconds", "End-to-end query latency.", ("department", "outcome")
+)
+
+
+class RequestTimer:
+    """
+    Collects the duration of each pipeline stage of one request. Stages are recorded
+    into the per-department histograms as they finish; `timings_ms()` returns the
+    breakdown for the response body.
+    """
+
+    def __init__(self, department):
+        self.department = department
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        # A stage that runs more than once in a request (e.g. per fan-out department) adds up
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        stage_seconds.observe(seconds, self.department, name)
+
+    def finish(self, outcome):
+        total = time.perf_counter() - self.started
+        request_seconds.observe(total, self.department, outcome)
+        return total
+
+    def timings_ms(self):
+        timings = {name: round(self.stages[name] * 1000, 2) for name in STAGES if name in self.stages}
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return timings
+
+
+def render_metrics():
+    return "\n".join([stage_seconds.render(), request_seconds.render()]) + "\n"
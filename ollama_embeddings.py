@@ -0,0 +1,68 @@
+import threading
+
+import httpx
+import requests
+from langchain_core.embeddings import Embeddings
+
+
+class OllamaBatchEmbeddings(Embeddings):
+    """
+    Ollama embeddings that send a whole list of texts in one `POST /api/embed` call.
+
+    langchain_community's OllamaEmbeddings posts every text separately to the legacy
+    `/api/embeddings` endpoint. The same instruction prefixes are kept, but `/api/embed`
+    returns unit-length vectors, so stores embedded through the old client must be rebuilt.
+    Used both for ingestion and for query embeddings, so the two always match.
+    """
+
+    def __init__(self, model="nomic-embed-text", base_url="http://localhost:11434", timeout=120,
+                 embed_instruction="passage: ", query_instruction="query: "):
+        self.model = model
+        self.url = f"{base_url.rstrip('/')}/api/embed"
+        self.timeout = timeout
+        self.embed_instruction = embed_instruction
+        self.query_instruction = query_instruction
+        self._session = requests.Session()
+        self._async_client = None
+        self._client_lock = threading.Lock()
+
+    def _vectors(self, response, count):
+        response.raise_for_status()
+        vectors = response.json()["embeddings"]
+        if len(vectors) != count:
+            raise ValueError(f"Ollama returned {len(vectors)} embeddings for {count} inputs")
+        return vectors
+
+    def embed(self, inputs):
+        """Embed `inputs` as they are, in a single request."""
+        if not inputs:
+            return []
+        response = self._session.post(self.url, json={"model": self.model, "input": inputs}, timeout=self.timeout)
+        return self._vectors(response, len(inputs))
+
+    async def aembed(self, inputs):
+        if not inputs:
+            return []
+        with self._client_lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._async_client.post(self.url, json={"model": self.model, "input": inputs})
+        return self._vectors(response, len(inputs))
+
+    def embed_documents(self, texts):
+        return self.embed([f"{self.embed_instruction}{text}" for text in texts])
+
+    async def aembed_documents(self, texts):
+        return await self.aembed([f"{self.embed_instruction}{text}" for text in texts])
+
+    def embed_queries(self, texts):
+        return self.embed([f"{self.query_instruction}{text}" for text in texts])
+
+    async def aembed_queries(self, texts):
+        return await self.aembed([f"{self.query_instruction}{text}" for text in texts])
+
+    def embed_query(self, text):
+        return self.embed_queries([text])[0]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_queries([text]))[0]
@@ -0,0 +1,49 @@
+GEMINI_MODEL = "gemini-2.0-flash"
+
+SYSTEM_PROMPT = (
+    "You are an intelligent AI assistant. Answer the user's question only from the provided context.\n"
+    "If the information is not found, say 'The document does not contain that detail.'"
+)
+
+
+def format_context(docs):
+    """
+    Render retrieved documents as the numbered context block used by every endpoint.
+    Chunks from a cross-department search are labelled with their department store.
+    """
+    context_segments = [
+        f"Result {i+1}{_store_label(doc)}: {doc.page_content}\n---\n"
+        for i, doc in enumerate(docs)
+    ]
+    return "\n".join(context_segments)
+
+
+def _store_label(doc):
+    metadata = getattr(doc, "metadata", None) or {}
+    store = metadata.get("store")
+    return f" [{store}]" if store else ""
+
+
+def build_system_instruction(context, system_prompt=SYSTEM_PROMPT):
+    return f"{system_prompt}\nContext: {context}"
+
+
+def build_request(docs, user_query, temperature=0.0, system_prompt=SYSTEM_PROMPT):
+    """
+    Build a single Gemini request for a RAG query: the instructions and the retrieved
+    context go in `system_instruction` and the user query is the only content, so each
+    question costs one round trip instead of a context message followed by the query.
+
+    The result is meant to be splatted into `client.models.generate_content(**request)`
+    (or the `client.aio` equivalent).
+    """
+    from google.genai import types # Imported on first use, it adds about a second to startup
+
+    return {
+        "model": GEMINI_MODEL,
+        "contents": user_query,
+        "config": types.GenerateContentConfig(
+            system_instruction=build_system_instruction(format_context(docs), system_prompt),
+            temperature=temperature # Keep temperature low for factual responses
+        ),
+    }
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from langchain_core.documents import Document
+
+from bm25_index import reciprocal_rank_fusion
+
+
+def _env_int(name, default):
+    return max(1, int(os.getenv(name, default)))
+
+
+# Per-stage concurrency limits, overridable through the environment
+EMBED_CONCURRENCY = _env_int("EMBED_CONCURRENCY", 16)
+SEARCH_CONCURRENCY = _env_int("SEARCH_CONCURRENCY", 8)
+GENERATE_CONCURRENCY = _env_int("GENERATE_CONCURRENCY", 32)
+RERANK_CONCURRENCY = _env_int("RERANK_CONCURRENCY", 2)
+
+# "hybrid" fuses BM25 and vector rankings when a department has a BM25 index, "vector" never does
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_FETCH_MULTIPLIER = _env_int("HYBRID_FETCH_MULTIPLIER", 3)
+# With a reranker configured, this many candidates are fetched and reranked down to the department's k
+RERANK_FETCH_K = _env_int("RERANK_FETCH_K", 20)
+
+# Chroma's similarity search is synchronous, so it runs on its own bounded pool
+# instead of the event loop (or the shared default executor).
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY, thread_name_prefix="vector-search")
+# Reranking is CPU-bound (a cross-encoder forward pass), so it gets a small pool of its own
+rerank_executor = ThreadPoolExecutor(max_workers=RERANK_CONCURRENCY, thread_name_prefix="rerank")
+
+# Semaphores are created lazily so they bind to the running event loop
+_semaphores = {}
+
+
+def stage_semaphore(stage):
+    if stage not in _semaphores:
+        limits = {
+            "embed": EMBED_CONCURRENCY,
+            "search": SEARCH_CONCURRENCY,
+            "generate": GENERATE_CONCURRENCY,
+            "rerank": RERANK_CONCURRENCY,
+        }
+        _semaphores[stage] = asyncio.Semaphore(limits[stage])
+    return _semaphores[stage]
+
+
+async def embed_query(embeddings, text):
+    """Embed the user query without blocking the event loop."""
+    async with stage_semaphore("embed"):
+        return await embeddings.aembed_query(text)
+
+
+async def embed_queries(embeddings, texts):
+    """
+    Embed several queries for a batch request. Repeated texts are embedded once, and
+    the uncached rest go to Ollama together in a single `/api/embed` request.
+    """
+    unique = list(dict.fromkeys(texts))
+    async with stage_semaphore("embed"):
+        vectors = await embeddings.aembed_queries(unique)
+    by_text = dict(zip(unique, vectors))
+    return [by_text[text] for text in texts]
+
+
+async def search_by_vector(vectorstore, query_vector, k, filter=None):
+    """Run the vector search on the bounded search pool, optionally pre-filtered on metadata."""
+    async with stage_semaphore("search"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            search_executor,
+            lambda: vectorstore.similarity_search_by_vector(query_vector, k=k, filter=filter)
+        )
+
+
+async def search_with_scores(vectorstore, query_vector, k, filter=None):
+    """Like `search_by_vector`, but returns `(Document, distance)` pairs (lower is closer)."""
+    async with stage_semaphore("search"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            search_executor,
+            lambda: vectorstore.similarity_search_by_vector_with_relevance_scores(query_vector, k=k, filter=filter)
+        )
+
+
+async def search_within_distance(vectorstore, query_vector, k, filter=None, max_distance=None):
+    """Vector search that drops results farther than `max_distance` (no cut-off when None)."""
+    scored = await search_with_scores(vectorstore, query_vector, k, filter)
+    return [doc for doc, distance in scored if max_distance is None or distance <= max_distance]
+
+
+async def lexical_search(lexical_index, text, k, filter=None):
+    """Run the BM25 search on the bounded search pool."""
+    async with stage_semaphore("search"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            search_executor,
+            lambda: [doc for doc, _ in lexical_index.search(text, k, filter=filter)]
+        )
+
+
+async def hybrid_search(vectorstore, lexical_index, query_vector, text, k, filter=None, max_distance=None):
+    """
+    Fetch HYBRID_FETCH_MULTIPLIER * k candidates from both the vector store and the BM25
+    index concurrently and fuse the two rankings with reciprocal rank fusion.
+    Vector candidates farther than `max_distance` are dropped before fusion.
+    """
+    fetch_k = k * HYBRID_FETCH_MULTIPLIER
+    vector_results, lexical_results = await asyncio.gather(
+        search_within_distance(vectorstore, query_vector, fetch_k, filter, max_distance),
+        lexical_search(lexical_index, text, fetch_k, filter)
+    )
+    return reciprocal_rank_fusion([vector_results, lexical_results], k)
+
+
+def _query_collection(vectorstore, query_vectors, k, where):
+    if hasattr(vectorstore, "search_batch"):  # FlatIndex answers the batch with one matrix product
+        return vectorstore.search_batch(query_vectors, k, where)
+    result = vectorstore._collection.query(
+        query_embeddings=query_vectors,
+        n_results=k,
+        where=where,
+        include=["documents", "metadatas", "distances"]
+    )
+    return [
+        [
+            (Document(page_content=text, metadata=metadata or {}), distance)
+            for text, metadata, distance in zip(texts, metadatas, distances)
+        ]
+        for texts, metadatas, distances in zip(result["documents"], result["metadatas"], result["distances"])
+    ]
+
+
+async def search_batch(vectorstore, query_vectors, k, filters, max_distance=None):
+    """
+    Vector search for a batch of queries with one Chroma query per distinct metadata
+    filter, instead of one search per query. `filters` holds each query's `where`
+    clause. Returns one document list per query, dropping results beyond `max_distance`.
+    """
+    groups = {}
+    for row, where in enumerate(filters):
+        groups.setdefault(json.dumps(where, sort_keys=True), []).append(row)
+
+    results = [None] * len(query_vectors)
+    loop = asyncio.get_running_loop()
+    async with stage_semaphore("search"):
+        for rows in groups.values():
+            scored_lists = await loop.run_in_executor(
+                search_executor,
+                partial(_query_collection, vectorstore, [query_vectors[row] for row in rows], k, filters[rows[0]])
+            )
+            for row, scored in zip(rows, scored_lists):
+                results[row] = [doc for doc, distance in scored if max_distance is None or distance <= max_distance]
+    return results
+
+
+async def hybrid_search_batch(vectorstore, lexical_index, query_vectors, texts, k, filters, max_distance=None):
+    """Batch version of `hybrid_search`: one batched vector search, then BM25 and fusion per query."""
+    fetch_k = k * HYBRID_FETCH_MULTIPLIER
+    vector_lists, lexical_lists = await asyncio.gather(
+        search_batch(vectorstore, query_vectors, fetch_k, filters, max_distance),
+        asyncio.gather(*(
+            lexical_search(lexical_index, text, fetch_k, where) for text, where in zip(texts, filters)
+        ))
+    )
+    return [
+        reciprocal_rank_fusion([vector_results, lexical_results], k)
+        for vector_results, lexical_results in zip(vector_lists, lexical_lists)
+    ]
+
+
+async def rerank(reranker, text, docs, top_n):
+    """Rerank candidates on the rerank pool and keep the best `top_n`."""
+    async with stage_semaphore("rerank"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            rerank_executor,
+            lambda: reranker.rerank(text, docs, top_n)
+        )
+
+
+async def generate(coroutine_factory):
+    """
+    Run a Gemini call under the generation limit.
+    `coroutine_factory` is a zero-argument callable returning the awaitable,
+    so the request is only issued once a slot is free.
+    """
+    async with stage_semaphore("generate"):
+        return await coroutine_factory()
@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+
+from answer_cache import chunk_id
+from bm25_index import tokenize
+from embedding_cache import normalize_query
+
+
+class Reranker:
+    """
+    Re-scores retrieved chunks against the query so only the best few reach Gemini.
+
+    Subclasses implement `score_pairs(query, texts)`, returning one relevance score
+    per text (higher is better). Scores are cached per (normalized query, chunk id),
+    so only chunks not seen with this question before are scored, in batches of
+    `batch_size`.
+    """
+
+    name = "base"
+
+    def __init__(self, batch_size=32, cache_size=10_000):
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (query, chunk id) -> score
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def score_pairs(self, query, texts):
+        raise NotImplementedError
+
+    def rerank(self, query, docs, top_n):
+        """Return the `top_n` documents of `docs`, best first. Ties keep the retrieval order."""
+        key_query = normalize_query(query)
+        keys = [(key_query, chunk_id(doc)) for doc in docs]
+        scores = [None] * len(docs)
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+            missing = [i for i, score in enumerate(scores) if score is None]
+            self.hits += len(docs) - len(missing)
+            self.misses += len(missing)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            for i, score in zip(batch, self.score_pairs(query, [docs[i].page_content for i in batch])):
+                scores[i] = float(score)
+        with self._lock:
+            for i in missing:
+                self._cache[keys[i]] = scores[i]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        order = sorted(range(len(docs)), key=lambda i: -scores[i])
+        return [docs[i] for i in order[:top_n]]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "reranker": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._cache),
+        }
+
+
+class LexicalReranker(Reranker):
+    """
+    Cheap reranker with no model: the share of query terms found in the chunk, plus a
+    bonus for query bigrams that appear verbatim (phrases like "leave balance").
+    """
+
+    name = "lexical"
+
+    def score_pairs(self, query, texts):
+        terms = tokenize(query)
+        unique_terms = set(terms)
+        bigrams = set(zip(terms, terms[1:]))
+        scores = []
+        for text in texts:
+            tokens = tokenize(text)
+            present = set(tokens)
+            coverage = len(unique_terms & present) / len(unique_terms) if unique_terms else 0.0
+            phrase = len(bigrams & set(zip(tokens, tokens[1:]))) / len(bigrams) if bigrams else 0.0
+            scores.append(coverage + 0.5 * phrase)
+        return scores
+
+
+class CrossEncoderReranker(Reranker):
+    """
+    Scores (query, chunk) pairs with a local CPU cross-encoder from sentence-transformers,
+    which is only imported when this reranker is built.
+    """
+
+    name = "cross-encoder"
+
+    def __init__(self, model_name="cross-encoder/ms-marco-MiniLM-L-6-v2", **kwargs):
+        super().__init__(**kwargs)
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score_pairs(self, query, texts):
+        return self.model.predict([(query, text) for text in texts], batch_size=self.batch_size)
+
+
+RERANKERS = {
+    LexicalReranker.name: LexicalReranker,
+    CrossEncoderReranker.name: CrossEncoderReranker,
+}
+
+
+def reranker_from_env():
+    """
+    Build the reranker named by RERANKER ("lexical" or "cross-encoder"), or return None
+    when reranking is off (the default). RERANK_MODEL picks the cross-encoder model.
+    """
+    name = os.getenv("RERANKER", "none").strip().lower()
+    if name in ("", "none"):
+        return None
+    if name not in RERANKERS:
+        raise ValueError(f"Unknown RERANKER {name!r}. Choose one of: none, {', '.join(RERANKERS)}")
+    kwargs = {
+        "batch_size": int(os.getenv("RERANK_BATCH_SIZE", 32)),
+        "cache_size": int(os.getenv("RERANK_CACHE_SIZE", 10_000)),
+    }
+    if name == CrossEncoderReranker.name and os.getenv("RERANK_MODEL"):
+        kwargs["model_name"] = os.getenv("RERANK_MODEL")
+    return RERANKERS[name](**kwargs)
@@ -0,0 +1,733 @@
+"""
+Multi-department RAG backend: serves every department's query routes
+(`/finance/query`, `/hr/query`, ..., plus the C-Level routes) from one process,
+over one embedding client, one Gemini client and one vector store registry.
+
+    uvicorn server:app
+
+`department_app(role)` builds an app with a single department's query routes, which
+the per-department entry points (`uvicorn finance:app`, ...) serve.
+"""
+from dotenv import load_dotenv
+
+# Before the imports below: departments and query_pipeline read their settings at import
+load_dotenv()
+
+from fastapi import FastAPI, Path, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from embedding_cache import get_cached_embeddings
+from vectorstore_registry import VectorStoreRegistry
+from prompts import build_request, GEMINI_MODEL, SYSTEM_PROMPT
+from departments import DEPARTMENTS
+from context_packer import pack_context
+from rerankers import reranker_from_env
+from metrics import RequestTimer, render_metrics, stage_seconds
+from metadata_filters import build_filter, validate_filters
+from answer_cache import answer_cache_from_env, chunk_id
+import query_pipeline
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+import threading
+import time
+
+# Note: GEMINI_API_KEY should be loaded from environment variables.
+# If running locally, ensure it's set in your .env file or system environment.
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Startup stays light: google.genai, the Ollama client and chromadb are imported on first
+# use, and a background warm-up loads them and preloads the department stores while
+# uvicorn already accepts connections. GET /health/ready reports its progress.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") != "0"
+# Departments opened by the warm-up, comma-separated (default: all); the others open on their first query
+PRELOAD_DEPARTMENTS = [
+    name.strip().lower() for name in os.getenv("PRELOAD_DEPARTMENTS", ",".join(DEPARTMENTS)).split(",")
+    if name.strip().lower() in DEPARTMENTS
+]
+WARMUP_QUERY = "warm-up"
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", 60)) # Seconds before a step is reported as failed
+# Status of each warm-up step: {"status": "pending" | "warming" | "warm" | "error", "seconds"/"error": ...}
+warmup_state = {
+    "ready": not WARMUP_ON_STARTUP,
+    "seconds": None,
+    "failed": [], # Steps readiness depends on that failed: "clients.embeddings", "departments.<name>"
+    "clients": {name: {"status": "pending"} for name in ("gemini", "embeddings")} if WARMUP_ON_STARTUP else {},
+    "departments": {name: {"status": "pending"} for name in PRELOAD_DEPARTMENTS} if WARMUP_ON_STARTUP else {},
+}
+
+
+def warm_up_lifespan(departments):
+    """Lifespan that starts the background warm-up, preloading `departments`."""
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if WARMUP_ON_STARTUP:
+            warmup_state["departments"] = {name: {"status": "pending"} for name in departments}
+            # Not awaited, so the server starts serving right away; kept on app.state so it isn't collected
+            app.state.warmup = asyncio.create_task(warm_up(departments))
+        yield
+
+    return lifespan
+
+
+# Initialize the FastAPI app
+app = FastAPI(lifespan=warm_up_lifespan(PRELOAD_DEPARTMENTS))
+
+# Re-initialize the embedding model and vectorstore
+embeddings = get_cached_embeddings("nomic-embed-text") # Query embeddings are cached and shared across departments
+
+# Department stores are opened once per worker and kept warm across requests
+vectorstore_registry = VectorStoreRegistry(
+    embeddings,
+    store_paths={name: config.store_path for name, config in DEPARTMENTS.items()},
+    backends={name: config.backend for name, config in DEPARTMENTS.items()}
+)
+
+# Answers to near-duplicate questions are reused until the department's store changes
+answer_cache = answer_cache_from_env()
+
+# Optional rerank stage between retrieval and generation (RERANKER=lexical|cross-encoder)
+reranker = reranker_from_env()
+
+# Departments with a vector store, and the C-Level sub-role that searches all of them at once
+SUPPORTED_ROLES = list(DEPARTMENTS)
+ALL_DEPARTMENTS = "all"
+FAN_OUT_K = int(os.getenv("FAN_OUT_K", 5)) # Global number of chunks kept across all departments
+FAN_OUT_MAX_CONTEXT_TOKENS = int(os.getenv("FAN_OUT_MAX_CONTEXT_TOKENS", 2000))
+
+# Batch endpoint limits: queries per request, and Gemini calls in flight per batch
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", 100))
+BATCH_GENERATE_CONCURRENCY = int(os.getenv("BATCH_GENERATE_CONCURRENCY", 8))
+
+class QueryRequest(BaseModel):
+    # This role field in the payload is still sent by the frontend,
+    # but the actual role for vectorstore connection will come from the URL path.
+    # It is optional so clients of the former per-department servers keep working.
+    role: str | None = None
+    query: str
+    # Optional metadata pre-filters, e.g. {"location": "Mumbai"} or {"leave_balance": {"$gte": 10}} for HR
+    filters: dict | None = None
+    # Include the per-stage latency breakdown (`timings_ms`) in the response, for debugging
+    timings: bool = False
+
+class BatchQueryRequest(BaseModel):
+    role: str | None = None
+    queries: list[str]
+    # Applied to every query in the batch, on top of each query's own HR employee-id filter
+    filters: dict | None = None
+    # Include the batch-level stage breakdown in the response
+    timings: bool = False
+
+def connect_vectorstore(role_key: str):
+    """
+    Connect to the Chroma vector store based on the given role key.
+    The role_key should be a lowercase string corresponding to the department.
+    Stores are served from the process-wide registry instead of being reopened per request.
+    """
+    if role_key not in SUPPORTED_ROLES:
+        # Raise an HTTPException for a bad request if the role is not supported
+        raise HTTPException(status_code=400, detail=f"Unsupported department role: {role_key}. Supported roles are: {', '.join(SUPPORTED_ROLES)}")
+    
+    try:
+        return vectorstore_registry.get(role_key)
+    except FileNotFoundError:
+        persist_directory_path = vectorstore_registry.store_path(role_key)
+        raise HTTPException(status_code=404, detail=f"Vector store for department '{role_key}' not found at {persist_directory_path}.")
+
+def check_filters(filters: dict | None):
+    """Reject malformed or unknown filters with a 400 before any store is searched."""
+    try:
+        validate_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# One Gemini client shared by every endpoint, created on first use or by the warm-up
+# The async surface (client.aio) keeps generation off the event loop
+# GEMINI_BASE_URL redirects it, e.g. to benchmarks/fake_servers.py for load tests
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+_client = None
+_client_lock = threading.Lock()
+
+
+def gemini_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.genai import Client, types
+
+                _client = Client(
+                    api_key=GEMINI_API_KEY,
+                    http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None
+                )
+    return _client
+
+
+async def fan_out_context(user_query: str, filters: dict | None, timer: RequestTimer):
+    """
+    Retrieval for the C-Level "all departments" mode. The query is embedded once, every
+    department store is searched concurrently, and the candidates are merged by vector
+    distance (all stores share one embedding model, so distances are comparable) under
+    a global FAN_OUT_K. Departments whose store is missing are skipped and reported.
+    Store opens and searches are recorded per department; the request's `search` stage
+    is the wall time of the whole concurrent fan-out.
+    """
+    with timer.stage("embed"):
+        query_vector = await query_pipeline.embed_query(embeddings, user_query)
+
+    async def search_department(department):
+        start = time.perf_counter()
+        vectorstore = await asyncio.to_thread(connect_vectorstore, department)
+        stage_seconds.observe(time.perf_counter() - start, department, "open_store")
+        where = build_filter(department, user_query, filters)
+        start = time.perf_counter()
+        scored = await query_pipeline.search_with_scores(vectorstore, query_vector, k=FAN_OUT_K, filter=where)
+        max_distance = DEPARTMENTS[department].max_distance
+        if max_distance is not None:
+            scored = [(doc, distance) for doc, distance in scored if distance <= max_distance]
+        search_seconds = time.perf_counter() - start
+        stage_seconds.observe(search_seconds, department, "search")
+        return scored, search_seconds * 1000
+
+    with timer.stage("search"):
+        outcomes = await asyncio.gather(
+            *(search_department(department) for department in SUPPORTED_ROLES),
+            return_exceptions=True
+        )
+
+    candidates, latencies, skipped = [], {}, {}
+    for department, outcome in zip(SUPPORTED_ROLES, outcomes):
+        if isinstance(outcome, HTTPException):
+            skipped[department] = outcome.detail
+            continue
+        if isinstance(outcome, Exception):
+            raise outcome
+        scored, latency_ms = outcome
+        latencies[department] = round(latency_ms, 2)
+        for doc, distance in scored:
+            # Tag each chunk with its department so the context shows where it came from
+            doc.metadata = {**doc.metadata, "store": department}
+            candidates.append((distance, doc))
+
+    candidates.sort(key=lambda candidate: candidate[0]) # Lower distance means more similar
+    results = pack_context([doc for _, doc in candidates[:FAN_OUT_K]], FAN_OUT_MAX_CONTEXT_TOKENS)
+    store_version = tuple(vectorstore_registry.version(department) for department in SUPPORTED_ROLES)
+    info = {"search_latency_ms": latencies, "skipped_departments": skipped}
+    return results, query_vector, store_version, info
+
+
+async def retrieve_context(department_role: str, user_query: str, filters: dict | None,
+                           fan_out: bool, timer: RequestTimer):
+    """
+    Runs the retrieval half of a query without blocking the event loop: the store is opened
+    off-loop, the query is embedded asynchronously and the vector search runs on the bounded
+    search pool, restricted by the metadata pre-filter built from `filters` and the query.
+    In hybrid mode the vector ranking is fused with the department's BM25 ranking, and
+    with a reranker configured the over-fetched candidates are reranked down to k.
+    Raises HTTPException for unknown departments or missing stores.
+    Returns the retrieved documents, the query embedding, the store version and extra
+    retrieval details for the response. `fan_out` searches every department instead.
+    Each stage is timed on `timer`.
+    """
+    if fan_out:
+        return await fan_out_context(user_query, filters, timer)
+
+    with timer.stage("open_store"):
+        vectorstore = await asyncio.to_thread(connect_vectorstore, department_role)
+        lexical_index = None
+        if query_pipeline.RETRIEVAL_MODE == "hybrid":
+            lexical_index = await asyncio.to_thread(vectorstore_registry.lexical_index, department_role)
+
+    # Perform similarity search to get context
+    with timer.stage("embed"):
+        query_vector = await query_pipeline.embed_query(embeddings, user_query)
+    where = build_filter(department_role, user_query, filters)
+    config = DEPARTMENTS[department_role]
+    # With a reranker, over-fetch candidates and let it pick the department's k
+    fetch_k = max(query_pipeline.RERANK_FETCH_K, config.k) if reranker else config.k
+    with timer.stage("search"):
+        if lexical_index is not None:
+            results = await query_pipeline.hybrid_search(
+                vectorstore, lexical_index, query_vector, user_query, k=fetch_k, filter=where,
+                max_distance=config.max_distance
+            )
+        else:
+            results = await query_pipeline.search_within_distance(
+                vectorstore, query_vector, k=fetch_k, filter=where, max_distance=config.max_distance
+            )
+    if reranker:
+        with timer.stage("rerank"):
+            results = await query_pipeline.rerank(reranker, user_query, results, config.k)
+    results = pack_context(results, config.max_context_tokens) # Bounds prompt size whatever the chunks hold
+    return results, query_vector, vectorstore_registry.version(department_role), {}
+
+
+def system_prompt_for(department_role: str) -> str:
+    config = DEPARTMENTS.get(department_role)
+    return config.system_prompt if config else SYSTEM_PROMPT
+
+
+def request_timer(department_role: str, fan_out: bool) -> RequestTimer:
+    # Metric labels are limited to known departments so arbitrary paths cannot add series
+    if fan_out:
+        return RequestTimer(ALL_DEPARTMENTS)
+    return RequestTimer(department_role if department_role in DEPARTMENTS else "unknown")
+
+
+async def answer_query(department_role: str, user_query: str, filters: dict | None = None,
+                       fan_out: bool = False, include_timings: bool = False):
+    """
+    Answers one query, calling Gemini through the async client.
+    Gemini is skipped entirely when the answer cache holds a near-duplicate question.
+    Stage latencies go to the /metrics histograms and, with `include_timings`, into the response.
+    """
+    if not user_query.strip():
+        return {"error": "Query cannot be empty."}
+
+    timer = request_timer(department_role, fan_out)
+
+    def respond(outcome, body):
+        timer.finish(outcome)
+        if include_timings:
+            body["timings_ms"] = timer.timings_ms()
+        return body
+
+    try:
+        results, query_vector, store_version, info = await retrieve_context(
+            department_role, user_query, filters, fan_out, timer
+        )
+    except HTTPException as e:
+        return respond("error", {"response": e.detail}) # Return the error message from the HTTPException
+    except Exception:
+        # Still a 500, but counted in the request metrics like any other failed request
+        timer.finish("error")
+        raise
+
+    try:
+        with timer.stage("cache_lookup"):
+            cached_answer = answer_cache.get(department_role, store_version, query_vector, results)
+        if cached_answer is not None:
+            return respond("cached", {"response": cached_answer, **info})
+
+        # Instructions, context and query go out in a single request
+        with timer.stage("prompt_build"):
+            request = build_request(results, user_query, system_prompt=system_prompt_for(department_role))
+        with timer.stage("generate"):
+            response = await query_pipeline.generate(lambda: gemini_client().aio.models.generate_content(**request))
+    except Exception:
+        timer.finish("error")
+        raise
+    answer_cache.put(department_role, store_version, query_vector, results, response.text)
+    return respond("answered", {"response": response.text, **info})
+
+
+async def answer_batch(department_role: str, queries: list[str], filters: dict | None = None,
+                       include_timings: bool = False):
+    """
+    Answers a list of queries against one department. Retrieval is shared across the
+    batch: queries are embedded together, searched with one Chroma query per distinct
+    filter and reranked/packed per query. Generation then runs with at most
+    BATCH_GENERATE_CONCURRENCY Gemini calls in flight for this batch (and within the
+    global generation limit). Results come back in request order, each with its own
+    timing and either a `response` or an `error`.
+    Raises HTTPException for unknown departments, missing stores, and empty or oversized batches.
+    """
+    if not queries:
+        raise HTTPException(status_code=400, detail="A batch needs at least one query.")
+    if len(queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {BATCH_MAX_QUERIES} queries, got {len(queries)}.")
+
+    timer = request_timer(department_role, False)
+    try:
+        with timer.stage("open_store"):
+            vectorstore = await asyncio.to_thread(connect_vectorstore, department_role)
+            lexical_index = None
+            if query_pipeline.RETRIEVAL_MODE == "hybrid":
+                lexical_index = await asyncio.to_thread(vectorstore_registry.lexical_index, department_role)
+        store_version = vectorstore_registry.version(department_role)
+
+        items = [{"index": i, "query": query} for i, query in enumerate(queries)]
+        pending = [item for item in items if item["query"].strip()]
+        for item in items:
+            if not item["query"].strip():
+                item["error"] = "Query cannot be empty."
+        texts = [item["query"] for item in pending]
+
+        config = DEPARTMENTS[department_role]
+        fetch_k = max(query_pipeline.RERANK_FETCH_K, config.k) if reranker else config.k
+        with timer.stage("embed"):
+            query_vectors = await query_pipeline.embed_queries(embeddings, texts)
+        wheres = [build_filter(department_role, text, filters) for text in texts]
+        with timer.stage("search"):
+            if lexical_index is not None:
+                result_lists = await query_pipeline.hybrid_search_batch(
+                    vectorstore, lexical_index, query_vectors, texts, fetch_k, wheres, config.max_distance
+                )
+            else:
+                result_lists = await query_pipeline.search_batch(
+                    vectorstore, query_vectors, fetch_k, wheres, config.max_distance
+                )
+        if reranker:
+            with timer.stage("rerank"):
+                result_lists = await asyncio.gather(*(
+                    query_pipeline.rerank(reranker, text, results, config.k)
+                    for text, results in zip(texts, result_lists)
+                ))
+        result_lists = [pack_context(results, config.max_context_tokens) for results in result_lists]
+
+        limit = asyncio.Semaphore(BATCH_GENERATE_CONCURRENCY)
+        system_prompt = system_prompt_for(department_role)
+
+        async def answer_item(item, query_vector, results):
+            start = time.perf_counter()
+            try:
+                answer = answer_cache.get(department_role, store_version, query_vector, results)
+                item["cached"] = answer is not None
+                if answer is None:
+                    request = build_request(results, item["query"], system_prompt=system_prompt)
+                    async with limit:
+                        response = await query_pipeline.generate(lambda: gemini_client().aio.models.generate_content(**request))
+                    answer = response.text
+                    answer_cache.put(department_role, store_version, query_vector, results, answer)
+                item["response"] = answer
+            except Exception as e:
+                item["error"] = f"Generation failed: {e}"
+            item["generate_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            item["latency_ms"] = round((time.perf_counter() - timer.started) * 1000, 2)
+
+        # Repeated questions in a batch are generated once and the answer is shared
+        first_by_query, duplicates = {}, []
+        unique = []
+        for item, query_vector, results in zip(pending, query_vectors, result_lists):
+            if item["query"] in first_by_query:
+                duplicates.append(item)
+            else:
+                first_by_query[item["query"]] = item
+                unique.append((item, query_vector, results))
+
+        with timer.stage("generate"):
+            await asyncio.gather(*(answer_item(*args) for args in unique))
+        for item in duplicates:
+            first = first_by_query[item["query"]]
+            item.update({key: value for key, value in first.items() if key not in ("index", "query")})
+    except Exception:
+        # Still raised (a 4xx/5xx), but counted in the request metrics like answer_query
+        timer.finish("error")
+        raise
+
+    errors = sum("error" in item for item in items)
+    timer.finish("error" if errors == len(items) else "answered")
+    body = {"results": items, "errors": errors}
+    if include_timings:
+        body["timings_ms"] = timer.timings_ms()
+    return body
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_query(department_role: str, user_query: str, filters: dict | None = None,
+                       fan_out: bool = False, include_timings: bool = False):
+    """
+    Server-Sent Events version of `answer_query`. Emits a `sources` event with the
+    retrieved chunks first, then one `token` event per Gemini stream chunk, then `done`.
+    Failures are reported as an `error` event since the response has already started.
+    With `include_timings` the `done` event carries the stage breakdown.
+    """
+    if not user_query.strip():
+        yield sse_event("error", {"detail": "Query cannot be empty."})
+        return
+
+    timer = request_timer(department_role, fan_out)
+
+    def done(outcome, payload):
+        timer.finish(outcome)
+        if include_timings:
+            payload["timings_ms"] = timer.timings_ms()
+        return sse_event("done", payload)
+
+    try:
+        results, query_vector, store_version, info = await retrieve_context(
+            department_role, user_query, filters, fan_out, timer
+        )
+    except HTTPException as e:
+        timer.finish("error")
+        yield sse_event("error", {"detail": e.detail})
+        return
+    except Exception as e:
+        # e.g. Ollama or the store failing mid-retrieval; the stream has started, so no 500 can be sent
+        timer.finish("error")
+        yield sse_event("error", {"detail": f"Retrieval failed: {e}"})
+        return
+
+    answer_parts = []
+    try:
+        yield sse_event("sources", [
+            {"rank": i + 1, "id": chunk_id(doc), "metadata": doc.metadata, "preview": doc.page_content[:200]}
+            for i, doc in enumerate(results)
+        ])
+
+        with timer.stage("cache_lookup"):
+            cached_answer = answer_cache.get(department_role, store_version, query_vector, results)
+        if cached_answer is not None:
+            yield sse_event("token", {"text": cached_answer})
+            yield done("cached", {"cached": True, **info})
+            return
+
+        async with query_pipeline.stage_semaphore("generate"):
+            with timer.stage("prompt_build"):
+                request = build_request(results, user_query, system_prompt=system_prompt_for(department_role))
+            # Measured up to the last chunk, so it includes the time the client takes to read the stream
+            with timer.stage("generate"):
+                async for chunk in await gemini_client().aio.models.generate_content_stream(**request):
+                    if chunk.text:
+                        answer_parts.append(chunk.text)
+                        yield sse_event("token", {"text": chunk.text})
+    except Exception as e:
+        timer.finish("error")
+        yield sse_event("error", {"detail": f"Generation failed: {e}"})
+        return
+
+    answer_cache.put(department_role, store_version, query_vector, results, "".join(answer_parts))
+    yield done("answered", {"cached": False, **info})
+
+
+async def warm_step(section: str, name: str, warm):
+    """Run one warm-up step, recording its status and duration. Returns its result, or None if it failed."""
+    entry = warmup_state[section][name]
+    entry["status"] = "warming"
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(warm(), WARMUP_STEP_TIMEOUT)
+    except asyncio.TimeoutError:
+        entry.update(status="error", error=f"timed out after {WARMUP_STEP_TIMEOUT:g}s")
+        return None
+    except Exception as exc:
+        entry.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        return None
+    entry.update(status="warm", seconds=round(time.perf_counter() - start, 3))
+    return result
+
+
+async def warm_embeddings():
+    # Straight to the model, past the query cache, so Ollama loads the model now rather than on the first query
+    model = await asyncio.to_thread(lambda: embeddings.embeddings)
+    return await model.aembed_query(WARMUP_QUERY)
+
+
+def warm_gemini_types():
+    """Build a request and parse a minimal response once, so the first query doesn't build their pydantic models."""
+    from google.genai import types
+
+    build_request([], WARMUP_QUERY)
+    types.GenerateContentResponse.model_validate(
+        {"candidates": [{"content": {"role": "model", "parts": [{"text": WARMUP_QUERY}]}, "finishReason": "STOP"}]}
+    )
+    return gemini_client()
+
+
+async def warm_gemini():
+    client = await asyncio.to_thread(warm_gemini_types)
+    # A metadata call opens the client's connection pool (and TLS session) without spending generation quota
+    await client.aio.models.get(model=GEMINI_MODEL)
+
+
+async def warm_department(role: str, query_vector: asyncio.Task):
+    async def warm():
+        vectorstore = await asyncio.to_thread(vectorstore_registry.get, role)
+        await asyncio.to_thread(vectorstore_registry.lexical_index, role)
+        # One search pages the index in, e.g. Chroma only loads its HNSW segment on the first query
+        vector = await query_vector
+        if vector is not None:
+            await query_pipeline.search_by_vector(vectorstore, vector, 1)
+
+    await warm_step("departments", role, warm)
+
+
+async def warm_up(departments=PRELOAD_DEPARTMENTS):
+    """
+    Preload what the first queries would otherwise pay for, in parallel: the Gemini
+    client and its first connection, the Ollama client and model (one dummy embedding),
+    and each of `departments` (store, BM25 index and one dummy search).
+    The server is only marked ready if the embeddings and every preloaded department
+    warmed; otherwise the failed steps are listed and readiness stays off. A Gemini
+    failure is reported but doesn't count, since the metadata call it makes is not
+    the generation path.
+    """
+    start = time.perf_counter()
+    query_vector = asyncio.create_task(warm_step("clients", "embeddings", warm_embeddings))
+    await asyncio.gather(
+        query_vector,
+        warm_step("clients", "gemini", warm_gemini),
+        *(warm_department(role, query_vector) for role in departments)
+    )
+    warmup_state["seconds"] = round(time.perf_counter() - start, 3)
+    failed = [] if warmup_state["clients"]["embeddings"]["status"] == "warm" else ["clients.embeddings"]
+    failed += [f"departments.{name}" for name in departments if warmup_state["departments"][name]["status"] != "warm"]
+    warmup_state["failed"] = failed
+    warmup_state["ready"] = not failed
+
+
+@app.get("/health/ready")
+async def health_ready(request: Request):
+    """
+    Readiness probe: 200 once the startup warm-up has succeeded, 503 while it runs or if
+    a step it depends on failed (listed in `failed`), with the status of each warm-up
+    step. Every department served also reports whether its store is open.
+    """
+    departments = {
+        name: {**warmup_state["departments"].get(name, {"status": "not_preloaded"}),
+               "open": vectorstore_registry.version(name) is not None}
+        for name in getattr(request.app.state, "departments", SUPPORTED_ROLES)
+    }
+    return JSONResponse({**warmup_state, "departments": departments},
+                        status_code=200 if warmup_state["ready"] else 503)
+
+
+# Admin endpoints for the vector store registry
+@app.get("/stores/stats")
+async def vectorstore_stats():
+    """Returns hit/miss/reload counters and the last open latency per department store."""
+    return vectorstore_registry.stats()
+
+
+@app.post("/stores/reload")
+async def reload_vectorstores(role: str | None = None):
+    """
+    Drops the cached store for `role` (or every store if omitted) so the next query
+    reopens it from disk, e.g. after re-running the ingestion scripts.
+    """
+    reloaded = vectorstore_registry.reload(role.strip().lower() if role else None)
+    return {"reloaded": reloaded}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-department stage and request latency histograms in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Returns hit-rate metrics for the query embedding, answer and rerank score caches."""
+    stats = {"embeddings": embeddings.stats(), "answers": answer_cache.stats()}
+    if reranker:
+        stats["rerank"] = reranker.stats()
+    return stats
+
+
+# Endpoint for C-Level specific queries with a sub-role in the path
+@app.post("/c-level/{sub_role}/query")
+async def ask_ai_c_level(
+    request: QueryRequest,
+    sub_role: str = Path(..., description="The specific department role for C-Level executives (e.g., 'finance', 'marketing', or 'all')")
+):
+    """
+    Handles AI queries for C-Level executives, routing to the appropriate
+    department's vector store based on the `sub_role` in the URL path.
+    `sub_role` "all" searches every department and reports per-department search latency.
+    """
+    # Use the sub_role from the path parameter, convert to lowercase for consistency
+    department_role = sub_role.strip().lower() 
+    fan_out = department_role == ALL_DEPARTMENTS # "all" searches every department store
+    check_filters(request.filters)
+    return await answer_query(department_role, request.query, request.filters, fan_out, request.timings)
+
+
+# Streaming (Server-Sent Events) variant of the C-Level endpoint
+@app.post("/c-level/{sub_role}/query/stream")
+async def stream_ai_c_level(
+    request: QueryRequest,
+    sub_role: str = Path(..., description="The specific department role for C-Level executives (e.g., 'finance', 'marketing', or 'all')")
+):
+    """Streams the answer for a C-Level query as Server-Sent Events."""
+    department_role = sub_role.strip().lower()
+    fan_out = department_role == ALL_DEPARTMENTS
+    check_filters(request.filters)
+    return StreamingResponse(
+        stream_query(department_role, request.query, request.filters, fan_out, request.timings),
+        media_type="text/event-stream"
+    )
+
+
+# Batch endpoint: many questions for one department in a single request
+@app.post("/{role}/query:batch")
+async def ask_ai_batch(
+    request: BatchQueryRequest,
+    role: str = Path(..., description="The department role (e.g., 'finance', 'general', 'hr')")
+):
+    """
+    Answers a list of queries for one department, for bulk jobs such as FAQ refreshes
+    or evaluation runs. Returns one result per query, in order.
+    """
+    department_role = role.strip().lower()
+    check_filters(request.filters)
+    return await answer_batch(department_role, request.queries, request.filters, request.timings)
+
+
+# Endpoint for general department queries
+@app.post("/{role}/query")
+async def ask_ai_general(
+    request: QueryRequest,
+    role: str = Path(..., description="The department role (e.g., 'finance', 'general', 'hr')")
+):
+    """
+    Handles AI queries for general department roles, routing to the appropriate
+    department's vector store based on the `role` in the URL path.
+    """
+    # Use the role from the path parameter, convert to lowercase for consistency
+    department_role = role.strip().lower()
+    check_filters(request.filters)
+    return await answer_query(department_role, request.query, request.filters, include_timings=request.timings)
+
+
+# Streaming (Server-Sent Events) variant of the general department endpoint
+@app.post("/{role}/query/stream")
+async def stream_ai_general(
+    request: QueryRequest,
+    role: str = Path(..., description="The department role (e.g., 'finance', 'general', 'hr')")
+):
+    """Streams the answer for a department query as Server-Sent Events."""
+    department_role = role.strip().lower()
+    check_filters(request.filters)
+    return StreamingResponse(
+        stream_query(department_role, request.query, request.filters, include_timings=request.timings),
+        media_type="text/event-stream"
+    )
+
+
+
+# Health, metrics and admin routes, which department_app shares with the full server
+OPERATIONS_PATHS = ("/health/ready", "/stores/stats", "/stores/reload", "/metrics", "/cache/stats")
+
+
+def department_app(role: str) -> FastAPI:
+    """
+    App that serves only `role`'s query routes (`/<role>/query`, its stream and batch
+    variants) plus the operations routes, for per-department deployments. It shares this
+    module's clients, caches and registry, and its warm-up preloads only `role`.
+    """
+    if role not in DEPARTMENTS:
+        raise ValueError(f"Unknown department: {role}")
+    department = FastAPI(lifespan=warm_up_lifespan([role]))
+    department.state.departments = [role]
+    department.router.routes.extend(route for route in app.routes if getattr(route, "path", None) in OPERATIONS_PATHS)
+
+    async def query(request: QueryRequest):
+        return await ask_ai_general(request, role)
+
+    async def stream(request: QueryRequest):
+        return await stream_ai_general(request, role)
+
+    async def batch(request: BatchQueryRequest):
+        return await ask_ai_batch(request, role)
+
+    department.add_api_route(f"/{role}/query", query, methods=["POST"])
+    department.add_api_route(f"/{role}/query/stream", stream, methods=["POST"])
+    department.add_api_route(f"/{role}/query:batch", batch, methods=["POST"])
+    return department
+
+
+# Use this back-end server
@@ -0,0 +1,37 @@
+from langchain_core.documents import Document
+
+from answer_cache import SemanticAnswerCache
+
+DOCS = [Document(page_content="Q3 revenue grew 12%"), Document(page_content="Q3 costs fell 3%")]
+
+
+def test_near_duplicate_query_hits():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.put("finance", "v1", [1.0, 0.0], DOCS, "Revenue grew 12%.")
+    assert cache.get("finance", "v1", [0.99, 0.05], list(reversed(DOCS))) == "Revenue grew 12%."
+    assert cache.get("finance", "v1", [0.0, 1.0], DOCS) is None  # different question
+    assert cache.get("finance", "v1", [1.0, 0.0], DOCS[:1]) is None  # different context
+    assert cache.get("marketing", "v1", [1.0, 0.0], DOCS) is None  # different department
+    assert cache.stats()["departments"]["finance"] == {"hits": 1, "misses": 2, "hit_ratio": 1 / 3, "entries": 1}
+
+
+def test_new_store_version_invalidates_department():
+    cache = SemanticAnswerCache()
+    cache.put("finance", "v1", [1.0, 0.0], DOCS, "old answer")
+    cache.put("hr", "v1", [1.0, 0.0], DOCS, "hr answer")
+    assert cache.get("finance", "v2", [1.0, 0.0], DOCS) is None
+    assert cache.stats()["invalidations"] == 1
+    # The old entry is gone even when asked with the old version again
+    assert cache.get("finance", "v1", [1.0, 0.0], DOCS) is None
+    assert cache.get("hr", "v1", [1.0, 0.0], DOCS) == "hr answer"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(max_entries_per_department=2)
+    for i, vector in enumerate(([1.0, 0.0], [0.0, 1.0])):
+        cache.put("finance", "v1", vector, DOCS, f"answer {i}")
+    cache.get("finance", "v1", [1.0, 0.0], DOCS)
+    cache.put("finance", "v1", [-1.0, 0.0], DOCS, "answer 2")
+    assert cache.get("finance", "v1", [0.0, 1.0], DOCS) is None
+    assert cache.get("finance", "v1", [1.0, 0.0], DOCS) == "answer 0"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,54 @@
+import numpy as np
+
+from bm25_index import BM25Index
+from flat_index import FlatIndex
+
+DOCUMENTS = [
+    "FINEMP1000 has 12 days of leave balance",
+    "FINEMP1001 has 3 days of leave balance",
+    "FINEMP1002 has 0 days of leave balance",
+    "The leave policy allows 24 days of leave",
+]
+METADATAS = [
+    {"employee_id": "FINEMP1000", "leave_balance": 12},
+    {"employee_id": "FINEMP1001", "leave_balance": 3},
+    {"employee_id": "FINEMP1002", "leave_balance": 0},
+    {"source": "handbook"},
+]
+
+
+def saved_index(tmp_path):
+    index = BM25Index([str(i) for i in range(len(DOCUMENTS))], DOCUMENTS, METADATAS)
+    index.save(str(tmp_path))
+    return index, BM25Index.load(str(tmp_path))
+
+
+def test_mapped_index_ranks_like_the_built_one(tmp_path):
+    index, mapped = saved_index(tmp_path)
+    assert BM25Index.exists(str(tmp_path))
+    for query, where in [("leave balance of FINEMP1001", None), ("leave balance of FINEMP1001", {"employee_id": "FINEMP1001"}),
+                         ("days of leave", {"leave_balance": {"$gte": 3}}), ("leave", {"employee_id": "FINEMP1999"})]:
+        expected = [(doc.page_content, round(score, 6)) for doc, score in index.search(query, 2, where)]
+        assert [(doc.page_content, round(score, 6)) for doc, score in mapped.search(query, 2, where)] == expected
+
+
+def test_filter_keeps_only_matching_rows(tmp_path):
+    _, mapped = saved_index(tmp_path)
+    [(doc, _)] = mapped.search("leave balance of FINEMP1001", 5, {"employee_id": "FINEMP1001"})
+    assert doc.metadata == METADATAS[1]
+
+
+class Collection:
+    def get(self, include):
+        vectors = np.eye(len(DOCUMENTS), dtype=np.float32).tolist()
+        return {"ids": [str(i) for i in range(len(DOCUMENTS))], "documents": DOCUMENTS,
+                "metadatas": METADATAS, "embeddings": vectors}
+
+
+def test_flat_index_filters_through_columns(tmp_path):
+    FlatIndex.export(Collection(), str(tmp_path))
+    assert FlatIndex.exists(str(tmp_path))
+    flat = FlatIndex.load(str(tmp_path))
+    results = flat.search([0, 1, 0, 0], 4, {"leave_balance": {"$lt": 10}})
+    assert [doc.metadata["employee_id"] for doc, _ in results] == ["FINEMP1001", "FINEMP1002"]
+    assert flat.search([1, 0, 0, 0], 4, {"employee_id": "FINEMP1999"}) == []
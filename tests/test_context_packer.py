@@ -0,0 +1,41 @@
+from langchain_core.documents import Document
+
+from context_packer import pack_context, remove_overlap
+
+# 300 characters without repeats, cut into chunks the way the splitter overlaps them
+TEXT = " ".join(f"word{i:02d}" for i in range(50))[:300]
+
+
+def test_remove_overlap_at_either_edge():
+    assert remove_overlap(TEXT[100:300], [TEXT[:200]]) == TEXT[200:300].strip()
+    assert remove_overlap(TEXT[:200], [TEXT[100:300]]) == TEXT[:100].strip()
+
+
+def test_remove_overlap_drops_contained_chunks():
+    assert remove_overlap(TEXT[50:150], [TEXT[:200]]) == ""
+
+
+def test_short_repeats_are_not_overlap():
+    # Fewer than MIN_OVERLAP_CHARS shared characters is a coincidence, not splitter overlap
+    assert remove_overlap(TEXT[190:300], [TEXT[:200]]) == TEXT[190:300]
+
+
+def test_pack_context_removes_overlap_and_copies_documents():
+    docs = [Document(page_content=TEXT[:200], metadata={"source": "a"}),
+            Document(page_content=TEXT[100:300], metadata={"source": "b"})]
+    packed = pack_context(docs, max_tokens=1000)
+    assert [doc.page_content for doc in packed] == [TEXT[:200], TEXT[200:300].strip()]
+    assert packed[1].metadata == {"source": "b"} and packed[1].metadata is not docs[1].metadata
+    assert docs[1].page_content == TEXT[100:300]
+
+
+def test_pack_context_truncates_to_the_budget():
+    docs = [Document(page_content=text * 400) for text in "abc"]  # 100 tokens each
+    packed = pack_context(docs, max_tokens=150)
+    assert [len(doc.page_content) for doc in packed] == [400, 200]
+
+
+def test_pack_context_drops_a_document_too_short_to_keep():
+    docs = [Document(page_content=text * 400) for text in "ab"]
+    packed = pack_context(docs, max_tokens=120)  # 20 tokens left for the second, under MIN_TRUNCATED_TOKENS
+    assert [doc.page_content for doc in packed] == ["a" * 400]
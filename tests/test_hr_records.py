@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from hr_records import build_hr_metadata, build_hr_summaries, iter_hr_records
+
+ROW = {
+    "employee_id": "FINEMP1000", "full_name": "Aarav Sharma", "role": "Analyst", "department": "Finance",
+    "email": "aarav@fintechco.com", "location": "Mumbai", "date_of_birth": "1990-05-01",
+    "date_of_joining": "2020-01-15", "manager_id": "FINEMP1001", "salary": 1234567.5,
+    "leave_balance": 12, "leaves_taken": 3, "attendance_pct": 95.5, "performance_rating": 4,
+    "last_review_date": "2024-03-31",
+}
+
+
+def test_summary_text():
+    [summary] = build_hr_summaries(pd.DataFrame([ROW])).tolist()
+    assert summary.startswith("Aarav Sharma (Employee ID: FINEMP1000) is a Analyst in the Finance department")
+    assert "joined FinTechCo on January 15, 2020" in summary
+    assert "annual salary of ₹1,234,567.50" in summary
+    assert summary.endswith("with 3 leaves taken and 12 days of leave remaining.")
+
+
+def test_missing_cells_are_written_as_nan():
+    df = pd.DataFrame([ROW, {**ROW, "employee_id": "FINEMP1001", "manager_id": np.nan, "salary": np.nan,
+                             "last_review_date": np.nan}])
+    summaries = build_hr_summaries(df).tolist()
+    assert all(isinstance(summary, str) for summary in summaries)
+    assert "manager is identified by Employee ID nan." in summaries[1]
+    assert "annual salary of ₹nan." in summaries[1]
+    assert "last performance review on nan," in summaries[1]
+
+
+def test_blank_csv_cell(tmp_path):
+    path = tmp_path / "hr_data.csv"
+    pd.DataFrame([ROW, {**ROW, "employee_id": "FINEMP1001", "manager_id": None}]).to_csv(path, index=False)
+    records = list(iter_hr_records(path))
+    assert [type(summary) for summary, _ in records] == [str, str]
+    # Chroma metadata can't hold nulls, so the missing field is left out
+    assert "manager_id" not in records[1][1]
+
+
+def test_metadata_types_and_timestamps():
+    [metadata] = build_hr_metadata(pd.DataFrame([ROW]))
+    assert metadata["performance_rating"] == 4 and isinstance(metadata["performance_rating"], int)
+    assert metadata["date_of_joining"] == "2020-01-15"
+    assert metadata["date_of_joining_ts"] == int(pd.Timestamp("2020-01-15").timestamp())
+    assert "date_of_birth" not in metadata
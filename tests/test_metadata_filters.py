@@ -0,0 +1,109 @@
+import re
+
+import numpy as np
+import pytest
+
+from metadata_filters import MetadataColumns, build_filter, matches, validate_filters
+
+METADATAS = [
+    {"employee_id": "FINEMP1000", "department": "Finance", "leave_balance": 12, "attendance_pct": 95.5},
+    {"employee_id": "FINEMP1001", "department": "HR", "leave_balance": 3, "manager_id": "FINEMP1000"},
+    {"employee_id": "FINEMP1002", "department": "Finance", "leave_balance": 0, "attendance_pct": 88.0},
+    {"source": "handbook"},
+]
+
+WHERES = [
+    {"employee_id": "FINEMP1001"},
+    {"leave_balance": 12.0},
+    {"leave_balance": {"$gte": 3}},
+    {"attendance_pct": {"$lt": 90}},
+    {"department": {"$in": ["HR", "Sales"]}},
+    {"department": {"$nin": ["HR"]}},
+    {"manager_id": {"$ne": "FINEMP1999"}},
+    {"department": {"$gt": 1}},
+    {"$and": [{"department": "Finance"}, {"leave_balance": {"$gt": 0}}]},
+    {"$or": [{"department": "HR"}, {"source": "handbook"}]},
+]
+
+
+@pytest.mark.parametrize("where", WHERES)
+def test_columns_match_like_matches(where, tmp_path):
+    expected = [i for i, metadata in enumerate(METADATAS) if matches(metadata, where)]
+    built = MetadataColumns.build(METADATAS)
+    built.save(str(tmp_path / "columns"))
+    for columns in (built, MetadataColumns.load(str(tmp_path / "columns"))):
+        assert columns.rows(where).tolist() == expected
+
+
+def test_no_filter_keeps_every_row():
+    assert MetadataColumns.build(METADATAS).rows(None) is None
+    assert matches(METADATAS[0], None)
+
+
+def test_unsupported_operators_raise():
+    columns = MetadataColumns.build(METADATAS)
+    for where in ({"$not": [{"department": "HR"}]}, {"department": {"$regex": "H.*"}}):
+        with pytest.raises(ValueError):
+            columns.rows(where)
+        with pytest.raises(ValueError):
+            matches(METADATAS[0], where)
+
+
+def test_exists(tmp_path):
+    prefix = str(tmp_path / "columns")
+    assert not MetadataColumns.exists(prefix)
+    MetadataColumns.build([]).save(prefix)
+    assert MetadataColumns.exists(prefix)
+    assert np.array_equal(MetadataColumns.load(prefix).rows({"department": "HR"}), [])
+
+
+@pytest.mark.parametrize("filters", [
+    None,
+    {"department": "Finance"},
+    {"location": ["Mumbai", "Pune"]},
+    {"attendance_pct": {"$gte": 90, "$lt": 99.5}},
+    {"date_of_joining_ts": {"$gt": 1672531200}, "manager_id": {"$nin": ["FINEMP1000"]}},
+])
+def test_valid_filters(filters):
+    validate_filters(filters)
+
+
+@pytest.mark.parametrize("filters, message", [
+    (["department"], "must be an object"),
+    ({"salary": 100}, "Unknown filter field 'salary'"),
+    ({"department": {}}, "has no operator"),
+    ({"department": {"$regex": "Fin"}}, "Unsupported operator '$regex'"),
+    ({"department": {"$gt": "F"}}, "needs a numeric field"),
+    ({"location": {"$in": []}}, "expects a non-empty list"),
+    ({"leave_balance": "12"}, "expects int, got str"),
+    ({"performance_rating": True}, "expects int, got bool"),
+    ({"manager_id": None}, "expects str, got null"),
+])
+def test_invalid_filters(filters, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        validate_filters(filters)
+
+
+def test_build_filter():
+    assert build_filter("finance", "revenue in Q3", None) is None
+    assert build_filter("finance", "revenue", {"source": "quarterly_report"}) == {"source": "quarterly_report"}
+    assert build_filter("hr", "who is in Pune", {"location": ["Pune", "Chennai"]}) == {
+        "location": {"$in": ["Pune", "Chennai"]}
+    }
+
+
+def test_build_filter_splits_ranges_into_clauses():
+    where = build_filter("hr", "long tenure", {"date_of_joining_ts": {"$gte": 1, "$lt": 2}, "department": "HR"})
+    assert where == {"$and": [
+        {"date_of_joining_ts": {"$gte": 1}}, {"date_of_joining_ts": {"$lt": 2}}, {"department": "HR"},
+    ]}
+
+
+def test_build_filter_adds_employee_ids_from_hr_queries():
+    assert build_filter("hr", "leave balance of finemp1003", None) == {"employee_id": "FINEMP1003"}
+    assert build_filter("hr", "compare HREMP1042 and FINEMP1003", None) == {
+        "employee_id": {"$in": ["FINEMP1003", "HREMP1042"]}
+    }
+    # An explicit employee_id filter wins, and other departments never get one
+    assert build_filter("hr", "FINEMP1003", {"employee_id": "FINEMP1004"}) == {"employee_id": "FINEMP1004"}
+    assert build_filter("finance", "FINEMP1003 expenses", None) is None
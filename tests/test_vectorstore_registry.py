@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+chromadb = pytest.importorskip("chromadb")
+
+from ingest import COLLECTION_NAME  # noqa: E402
+from vectorstore_registry import VectorStoreRegistry, mark_store_updated  # noqa: E402
+
+
+class ConstantEmbeddings(Embeddings):
+    """Never called for vector searches; the registry just needs an embedding function."""
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def reingest(path):
+    # In another process, like ingest.py: replace chunk "a" with "c"
+    subprocess.run([sys.executable, "-c", textwrap.dedent(f"""
+        import chromadb
+        collection = chromadb.PersistentClient(path={path!r}).get_collection({COLLECTION_NAME!r})
+        collection.delete(ids=["a"])
+        collection.add(ids=["c"], documents=["gamma"], embeddings=[[0.9, 0.1, 0.0]], metadatas=[{{"row": 3}}])
+    """)], check=True)
+    mark_store_updated(path, 2)
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "general_vector_store")
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection(COLLECTION_NAME, embedding_function=None)
+    collection.add(
+        ids=["a", "b"], documents=["alpha", "beta"],
+        embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], metadatas=[{"row": 1}, {"row": 2}]
+    )
+    mark_store_updated(path, 2)
+    return path
+
+
+def texts(vectorstore):
+    return [doc.page_content for doc in vectorstore.similarity_search_by_vector([1.0, 0.0, 0.0], k=2)]
+
+
+def test_reopens_store_after_reingest(store):
+    registry = VectorStoreRegistry(ConstantEmbeddings(), store_paths={"general": store})
+    assert texts(registry.get("general")) == ["alpha", "beta"]
+
+    reingest(store)
+
+    assert texts(registry.get("general")) == ["gamma", "beta"]
+    assert registry.stats()["reloads"] == 1
+
+
+def test_reload_reopens_store(store):
+    registry = VectorStoreRegistry(ConstantEmbeddings(), store_paths={"general": store})
+    texts(registry.get("general"))
+    reingest(store)
+
+    assert registry.reload("general") == ["general"]
+    assert texts(registry.get("general")) == ["gamma", "beta"]
+
+
+def test_unchanged_store_is_served_from_cache(store):
+    registry = VectorStoreRegistry(ConstantEmbeddings(), store_paths={"general": store})
+    first = registry.get("general")
+    texts(first)  # Chroma touches its own files when queried
+
+    assert registry.get("general") is first
+    assert registry.stats()["hits"] == 1
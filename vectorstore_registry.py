@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+
+from bm25_index import BM25Index
+from flat_index import FlatIndex
+
+# Rewritten by ingest.py each time it changes a store. Its stat is the store's version:
+# Chroma itself touches chroma.sqlite3 when a store is opened or queried, so the store's
+# own files can't tell a re-ingest apart from a read.
+STORE_MARKER = "store_version.json"
+
+
+def mark_store_updated(path, chunks):
+    """Record that the store at `path` changed, so backends reopen it on their next query."""
+    marker = os.path.join(path, STORE_MARKER)
+    with open(marker + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"updated_at": time.time(), "chunks": chunks}, file)
+    os.replace(marker + ".tmp", marker)
+
+
+def _forget_chroma_client(path):
+    """
+    Drop chromadb's cached client for `path`. chromadb keeps one System per persist
+    directory in the process and hands it back to every new client, so without this a
+    reopened store would still search the HNSW segment loaded before the re-ingest.
+    Stores already handed out keep their old System until they are released.
+    """
+    from chromadb.api.shared_system_client import SharedSystemClient
+
+    SharedSystemClient._identifier_to_system.pop(path, None)
+    SharedSystemClient._identifier_to_refcount.pop(path, None)
+
+
+class VectorStoreRegistry:
+    """
+    Process-wide cache of opened Chroma vector stores, one per department.
+
+    Opening a Chroma store means a SQLite open plus loading the HNSW index from
+    disk, so each store is opened once and kept warm for the life of the worker.
+    A store is reopened when `reload()` is called, or automatically on the next
+    `get()` if ingest.py has updated it since it was opened (see STORE_MARKER).
+
+    `backends` maps a role to "flat" to serve it from the NumPy FlatIndex exported
+    next to the Chroma files instead of from Chroma itself.
+    """
+
+    def __init__(self, embedding_function, store_dir_template="{role}_vector_store", store_paths=None,
+                 backends=None):
+        self.embedding_function = embedding_function
+        self.store_dir_template = store_dir_template
+        self.store_paths = dict(store_paths or {})  # role -> explicit store directory
+        self.backends = dict(backends or {})  # role -> "chroma" (default) or "flat"
+        self._stores = {}  # role -> (vectorstore, on-disk signature at open time)
+        self._lexical = {}  # role -> (BM25Index or None, on-disk signature at load time)
+        self._lock = threading.Lock()
+        self._role_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.open_seconds = {}  # role -> latency of the most recent open
+
+    def store_path(self, role_key):
+        return self.store_paths.get(role_key) or self.store_dir_template.format(role=role_key)
+
+    def _signature(self, path):
+        """Version of a store: one stat of its marker file, (0, 0) for stores built without one."""
+        try:
+            stat = os.stat(os.path.join(path, STORE_MARKER))
+        except FileNotFoundError:
+            return 0, 0
+        return stat.st_mtime_ns, stat.st_size
+
+    def _role_lock(self, role_key):
+        with self._lock:
+            return self._role_locks.setdefault(role_key, threading.Lock())
+
+    def get(self, role_key):
+        """
+        Return the warm vector store for `role_key`, opening it on first use.
+        Raises FileNotFoundError if the store directory does not exist.
+        """
+        path = self.store_path(role_key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+        # One lock per role so a slow open of one store doesn't block the others
+        with self._role_lock(role_key):
+            cached = self._stores.get(role_key)
+            signature = self._signature(path)
+            if cached is not None and cached[1] == signature:
+                self.hits += 1
+                return cached[0]
+
+            self.misses += 1
+            if cached is not None:
+                self.reloads += 1
+            return self._open(role_key, path, signature)
+
+    def _open(self, role_key, path, signature):
+        start = time.perf_counter()
+        if self.backends.get(role_key) == "flat":
+            if not FlatIndex.exists(path):
+                raise FileNotFoundError(os.path.join(path, FlatIndex.VECTORS_FILE))
+            vectorstore = FlatIndex.load(path)
+        else:
+            # Imported here so chromadb is only loaded by workers that serve a Chroma store
+            from langchain_community.vectorstores import Chroma
+
+            _forget_chroma_client(path)
+            vectorstore = Chroma(
+                persist_directory=path,
+                embedding_function=self.embedding_function
+            )
+        self.open_seconds[role_key] = time.perf_counter() - start
+        self._stores[role_key] = (vectorstore, signature)
+        return vectorstore
+
+    def lexical_index(self, role_key):
+        """
+        Return the BM25 index saved with the department's store by ingest.py, loaded once
+        and reloaded with the store. Returns None if the store has no saved BM25 index.
+        """
+        path = self.store_path(role_key)
+        with self._role_lock(role_key):
+            signature = self._signature(path)
+            cached = self._lexical.get(role_key)
+            if cached is not None and cached[1] == signature:
+                return cached[0]
+            index = None
+            if BM25Index.exists(path):
+                index = BM25Index.load(path)
+            self._lexical[role_key] = (index, signature)
+            return index
+
+    def version(self, role_key):
+        """Signature of the on-disk store currently served for `role_key` (None if not open)."""
+        cached = self._stores.get(role_key)
+        return cached[1] if cached is not None else None
+
+    def reload(self, role_key=None):
+        """Drop the cached store(s) so the next `get()` reopens them from disk."""
+        with self._lock:
+            roles = [role_key] if role_key is not None else list(self._stores)
+            for role in roles:
+                self._lexical.pop(role, None)
+                if self._stores.pop(role, None) is not None:
+                    self.reloads += 1
+        return roles
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "hit_rate": self.hits / total if total else 0.0,
+            "open_seconds": dict(self.open_seconds),
+            "open_stores": sorted(self._stores),
+        }